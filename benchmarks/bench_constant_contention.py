@@ -0,0 +1,75 @@
+"""Contention benchmark for `constant`.
+
+A pool of threads all request the same expensive, uncomputed constant at once. With single-flight
+computation the method runs once and the other threads wait for it. The unguarded descriptor below
+reproduces the previous behaviour, where every thread that arrives before the first one finishes
+runs the computation itself.
+
+Run from the repository root with `python -m benchmarks.bench_constant_contention`.
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from class_only_design import ClassOnly
+from class_only_design import constant
+
+
+class unguarded_constant(constant):
+    def __get__(self, instance, cls):
+        if cls not in self._values:
+            self._values[cls] = self.method(cls)
+        return self._values[cls]
+
+
+def expensive(size):
+    return sum(i * i for i in range(size))
+
+
+def make_class(descriptor, size, calls):
+    class Methodology(ClassOnly):
+        @descriptor
+        def config(cls):
+            calls.append(None)
+            return expensive(size)
+
+    return Methodology
+
+
+def run(descriptor, threads, size):
+    calls = []
+    cls = make_class(descriptor, size, calls)
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        barrier.wait()
+        return cls.config
+
+    with ThreadPoolExecutor(threads) as pool:
+        start = time.perf_counter()
+        futures = [pool.submit(worker) for _ in range(threads)]
+        results = {f.result() for f in futures}
+        elapsed = time.perf_counter() - start
+    assert len(results) == 1
+    return elapsed, len(calls)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--size", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    naive_time, naive_calls = run(unguarded_constant, args.threads, args.size)
+    flight_time, flight_calls = run(constant, args.threads, args.size)
+
+    print(f"threads: {args.threads}")
+    print(f"unguarded:     {naive_time:8.3f}s  {naive_calls:3d} computations")
+    print(f"single-flight: {flight_time:8.3f}s  {flight_calls:3d} computations")
+    print(f"speedup:       {naive_time / flight_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+"""Benchmarks for the hot paths in class_only_design.
+
+Run the suite and print the results:
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --output results.json --filter namespace
+
+Compare two commits, or two saved result files, and report regressions:
+
+    python -m benchmarks.suite --compare HEAD~1 HEAD
+    python -m benchmarks.suite --compare old.json new.json --threshold 0.05
+
+When comparing commits, each one is checked out into a temporary git worktree and this file is
+run against it, so the same benchmarks are used for both. Benchmarks that use features missing
+from a commit are skipped. The exit status is 1 if anything regressed.
+
+This module only imports class_only_design, so it can also be run as a script by path against
+whichever class_only_design is importable.
+"""
+
+import argparse
+import gc
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import class_only_design
+from class_only_design import ClassOnly
+from class_only_design import Namespace
+from class_only_design import constant
+
+BENCHMARKS = {}
+
+
+def benchmark(name, unit="s"):
+    """Register a benchmark.
+
+    For timing benchmarks (unit "s"), the decorated function takes a number of operations and
+    returns a zero argument callable that performs them; any setup happens before it returns. For
+    memory benchmarks (unit "B"), the function returns bytes per operation directly.
+    """
+
+    def decorator(function):
+        BENCHMARKS[name] = unit, function
+        return function
+
+    return decorator
+
+
+def time_per_op(make, min_time=0.1, repeat=5):
+    """Return the best time per operation over `repeat` runs of `make`. As with timeit, garbage
+    collection is disabled while timing.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _time_per_op(make, min_time, repeat)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _time_per_op(make, min_time, repeat):
+    number = 1
+    while True:
+        run = make(number)
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 2 or number >= 10**7:
+            break
+        number *= 10
+    best = elapsed
+    for _ in range(repeat - 1):
+        run = make(number)
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def make_namespace(name, members, bases=(Namespace,)):
+    classdict = {f"m{i}": i for i in range(members)}
+    return type(bases[0])(name, tuple(bases), classdict)
+
+
+def make_chain(depth, members):
+    cls = Namespace
+    for level in range(depth):
+        cls = make_namespace(f"Level{level}", members, bases=(cls,))
+        # Make each level override one inherited member
+        members += 1
+    return cls
+
+
+# Class creation
+
+
+def _class_creation(members, bases):
+    parents = [make_namespace(f"Base{i}", 10) for i in range(bases)]
+    classdict = {f"m{i}": i for i in range(members)}
+
+    def make(number):
+        def run():
+            for _ in range(number):
+                type(Namespace)("Created", tuple(parents), dict(classdict))
+
+        return run
+
+    return make
+
+
+for _members in (10, 100, 1000):
+    for _bases in (1, 4):
+        benchmark(f"namespace_creation[members={_members},bases={_bases}]")(
+            _class_creation(_members, _bases)
+        )
+
+
+@benchmark("class_only_creation")
+def class_only_creation(number):
+    def run():
+        for _ in range(number):
+            type(ClassOnly)(
+                "Created", (ClassOnly,), {"a": 1, "method": classmethod(len)}
+            )
+
+    return run
+
+
+# Constants
+
+
+def _constant_class():
+    class Constants(ClassOnly):
+        @constant
+        def value(cls):
+            return 1
+
+    return Constants
+
+
+@benchmark("constant_first_access")
+def constant_first_access(number):
+    base = _constant_class()
+    classes = [type(base)(f"C{i}", (base,), {}) for i in range(number)]
+
+    def run():
+        for cls in classes:
+            cls.value
+
+    return run
+
+
+@benchmark("shared_constant_first_access")
+def shared_constant_first_access(number):
+    class Constants(ClassOnly):
+        @constant(shared=True)
+        def value(cls):
+            return 1
+
+    classes = [type(Constants)(f"C{i}", (Constants,), {}) for i in range(number)]
+
+    def run():
+        for cls in classes:
+            cls.value
+
+    return run
+
+
+@benchmark("constant_repeated_access")
+def constant_repeated_access(number):
+    cls = _constant_class()
+    cls.value
+
+    def run():
+        for _ in range(number):
+            cls.value
+
+    return run
+
+
+@benchmark("installed_constant_repeated_access")
+def installed_constant_repeated_access(number):
+    from class_only_design import installed_constant
+
+    class Constants(ClassOnly):
+        @installed_constant
+        def value(cls):
+            return 1
+
+    Constants.value
+
+    def run():
+        for _ in range(number):
+            Constants.value
+
+    return run
+
+
+@benchmark("memoized_hit")
+def memoized_hit(number):
+    from class_only_design import memoized
+
+    class Methodology(ClassOnly):
+        @memoized
+        def rate(cls, currency, days):
+            return days
+
+    Methodology.rate("USD", 1)
+
+    def run():
+        for _ in range(number):
+            Methodology.rate("USD", 1)
+
+    return run
+
+
+# Iteration
+
+
+def _iteration(depth):
+    cls = make_chain(depth, 5)
+
+    def make(number):
+        def run():
+            for _ in range(number):
+                for _ in cls:
+                    pass
+
+        return run
+
+    return make
+
+
+for _depth in (1, 10, 100):
+    benchmark(f"namespace_iteration[depth={_depth}]")(_iteration(_depth))
+
+
+# Member access
+
+
+@benchmark("namespace_member_access[depth=10]")
+def namespace_member_access(number):
+    cls = make_chain(10, 5)
+
+    def run():
+        for _ in range(number):
+            cls.m3
+
+    return run
+
+
+@benchmark("frozen_member_access[depth=10]")
+def frozen_member_access(number):
+    frozen = make_chain(10, 5).as_frozen()
+
+    def run():
+        for _ in range(number):
+            frozen.m3
+
+    return run
+
+
+# Membership
+
+
+@benchmark("namespace_contains[members=1000]")
+def namespace_contains(number):
+    cls = make_namespace("Members", 1000)
+
+    def run():
+        for _ in range(number):
+            999 in cls
+
+    return run
+
+
+@benchmark("namespace_validate[members=1000,values=1000]")
+def namespace_validate(number):
+    cls = make_namespace("Members", 1000)
+    values = list(range(1000))
+
+    def run():
+        for _ in range(number):
+            cls.validate(values)
+
+    return run
+
+
+# nameof
+
+
+@benchmark("nameof_lookup")
+def nameof_lookup(number):
+    cls = make_chain(10, 5)
+
+    def run():
+        nameof = cls.nameof
+        for _ in range(number):
+            nameof.m3
+
+    return run
+
+
+# Memory
+
+
+def bytes_per_class(factory, count=1000):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        classes = [factory(i) for i in range(count)]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del classes
+    return (after - before) / count
+
+
+@benchmark("memory_per_namespace[members=10]", unit="B")
+def memory_per_namespace():
+    return bytes_per_class(lambda i: make_namespace(f"N{i}", 10))
+
+
+@benchmark("memory_per_class_only_with_constant", unit="B")
+def memory_per_class_only():
+    base = _constant_class()
+
+    def factory(i):
+        cls = type(base)(f"C{i}", (base,), {})
+        cls.value
+        return cls
+
+    return bytes_per_class(factory)
+
+
+def run(pattern=None):
+    """Run the benchmarks whose names contain `pattern`, and return a results dict."""
+    results = {}
+    for name, (unit, function) in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        try:
+            value = time_per_op(function) if unit == "s" else function()
+        except (AttributeError, ImportError, TypeError) as e:
+            # The library under test predates a feature this benchmark needs
+            print(f"skipped {name}: {e!r}", file=sys.stderr)
+            continue
+        results[name] = {"value": value, "unit": unit}
+        print(format_result(name, value, unit), file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "library": str(pathlib.Path(class_only_design.__file__).parent),
+        "results": results,
+    }
+
+
+def format_value(value, unit):
+    if unit == "B":
+        return f"{value:10.0f} B "
+    for scale, suffix in ((1, "s "), (1e-3, "ms"), (1e-6, "us")):
+        if value >= scale:
+            return f"{value / scale:10.3f} {suffix}"
+    return f"{value / 1e-9:10.3f} ns"
+
+
+def format_result(name, value, unit):
+    return f"{name:55} {format_value(value, unit)}"
+
+
+def _results_for(source, pattern):
+    """Load results from a json file, or run the suite against a git revision."""
+    if source.endswith(".json") and os.path.exists(source):
+        with open(source) as f:
+            return json.load(f)
+
+    root = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    with tempfile.TemporaryDirectory() as temp:
+        worktree = os.path.join(temp, "tree")
+        output = os.path.join(temp, "results.json")
+        subprocess.run(
+            ["git", "-C", root, "worktree", "add", "--detach", worktree, source],
+            check=True,
+            capture_output=True,
+        )
+        try:
+            print(f"== {source}", file=sys.stderr)
+            command = [sys.executable, os.path.abspath(__file__), "--output", output]
+            if pattern:
+                command += ["--filter", pattern]
+            environment = dict(os.environ, PYTHONPATH=worktree)
+            subprocess.run(command, cwd=worktree, env=environment, check=True)
+            with open(output) as f:
+                return json.load(f)
+        finally:
+            subprocess.run(
+                ["git", "-C", root, "worktree", "remove", "--force", worktree],
+                check=True,
+                capture_output=True,
+            )
+
+
+def compare(old, new, threshold):
+    """Print a comparison of two result dicts. Return the names of benchmarks that got slower
+    or larger by more than `threshold`, as a fraction.
+    """
+    regressions = []
+    print(f"{'benchmark':55} {'old':>13} {'new':>13} {'change':>8}")
+    for name, result in new["results"].items():
+        if name not in old["results"]:
+            continue
+        before = old["results"][name]["value"]
+        after = result["value"]
+        unit = result["unit"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  improved"
+        print(
+            f"{name:55} {format_value(before, unit)} {format_value(after, unit)}"
+            f" {change:+8.1%}{flag}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks for class_only_design.",
+        epilog="See the module docstring for examples.",
+    )
+    parser.add_argument("--filter", help="only run benchmarks containing this string")
+    parser.add_argument("--output", help="write results to this json file")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="compare two git revisions or result files",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="fractional slowdown reported as a regression (default 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        old, new = (_results_for(source, args.filter) for source in args.compare)
+        regressions = compare(old, new, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s)")
+            return 1
+        return 0
+
+    results = run(args.filter)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,4 +9,14 @@ __version__ = "1.0.0"
 from class_only_design.api import ClassOnly
 from class_only_design.api import Namespace
 from class_only_design.api import constant
+from class_only_design.api import async_constant
+from class_only_design.api import refreshable_constant
+from class_only_design.api import refresh
+from class_only_design.api import persistent_constant
+from class_only_design.api import installed_constant
+from class_only_design.api import shared_memory_constant
+from class_only_design.api import evictable_constant
+from class_only_design.api import memoized
 from class_only_design.constants import autoname
+from class_only_design.constants import autoflag
+from class_only_design.preload import warm
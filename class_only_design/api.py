@@ -1,9 +1,29 @@
+import collections
+import contextlib
 import functools
+import os
+import threading
+import time
+import types
+import weakref
 
 from class_only_design.meta import OnlyMeta
 from class_only_design.meta import MetaNamespace
+from class_only_design import budget
+from class_only_design import meta
 from class_only_design import util
 
+# Per-thread stack of the constants currently being computed, used to record which constants
+# read which others.
+_computing = threading.local()
+
+_missing = object()
+_ref = weakref.ref
+
+# Set by class_only_design.instrument while instrumentation is enabled. Called in place of each
+# constant's method as observer(descriptor, cls).
+_observer = None
+
 
 class ClassOnly(metaclass=OnlyMeta):
     """
@@ -25,19 +45,689 @@ class constant:
 
     Note that using @constant implies a classmethod. You don't need to also apply the
     classmethod decorator
+
+    Constants are safe to access from multiple threads. If several threads request the same
+    uncomputed constant, one of them calls the method and the rest wait for its result.
+
+    Values are stored against a weak reference to their class, so they are released when the
+    class is garbage collected. A value that refers back to its own class will keep that class
+    alive.
+
+    By default each subclass computes its own value. A constant that gives the same value for
+    subclasses can be shared with them instead:
+
+        class Template(ClassOnly):
+            columns = ("a", "b")
+
+            @constant(shared=True)
+            def registry(cls):
+                return load_registry()
+
+            @constant(depends_on=["columns"])
+            def layout(cls):
+                return build_layout(cls.columns)
+
+    A shared constant is computed once, for the class that defines it, and subclasses reuse that
+    value. With `depends_on`, the value is computed for the least derived class that sees the
+    same definitions of the named class attributes as the class being accessed, so only
+    subclasses that override one of them compute their own value.
+    """
+
+    def __init__(self, method=None, *, shared=False, depends_on=None):
+        self.shared = shared or depends_on is not None
+        self.depends_on = () if depends_on is None else tuple(depends_on)
+        self._owner = None
+        if method is not None:
+            self._setup(method)
+
+    def __call__(self, method):
+        self._setup(method)
+        return self
+
+    def _setup(self, method):
+        self.method = method
+        self.name = method.__name__
+        self._values = weakref.WeakKeyDictionary()
+        # The dict underlying _values, keyed by weak references to classes. Reading it directly
+        # avoids a Python level call on every access.
+        self._data = self._values.data
+        # One lock per class currently computing this constant, guarded by _lock
+        self._lock = threading.Lock()
+        self._locks = {}
+        # The constants each class's computation read before they were computed, as
+        # (weakref to class, name) pairs
+        self._dependencies = weakref.WeakKeyDictionary()
+
+    def __set_name__(self, owner, name):
+        if not isinstance(owner, OnlyMeta):
+            raise TypeError(
+                f"{type(self).__name__} can only be used with ClassOnly classes"
+            )
+        self.name = name
+        self._owner = owner
+
+    def __get__(self, instance, cls):
+        try:
+            return self._data[_ref(cls)]
+        except KeyError:
+            return self._compute(cls)
+
+    def _lock_for(self, cls):
+        with self._lock:
+            return self._locks.setdefault(cls, threading.RLock())
+
+    def _release_lock(self, cls, lock):
+        with self._lock:
+            if self._locks.get(cls) is lock:
+                del self._locks[cls]
+
+    def _anchor(self, cls):
+        """Return the least derived class whose value a shared constant on `cls` can reuse: one
+        that resolves this constant and every attribute in depends_on to the same definitions.
+        """
+        if self._owner is None:
+            return cls
+        names = (self.name, *self.depends_on)
+        definers = [_definer(cls, name) for name in names]
+        if definers[0] is not self._owner:
+            return cls
+        for c in reversed(cls.__mro__):
+            if c is cls or [_definer(c, name) for name in names] == definers:
+                return c
+
+    def _compute(self, cls):
+        if self.shared:
+            anchor = self._anchor(cls)
+            if anchor is not cls:
+                value = self.__get__(None, anchor)
+                with self._lock:
+                    return self._values.setdefault(cls, value)
+        stack = _computing.__dict__.setdefault("stack", [])
+        if stack:
+            stack[-1].add((weakref.ref(cls), self.name))
+        lock = self._lock_for(cls)
+        try:
+            with lock:
+                # Another thread may have finished while we waited
+                value = self._values.get(cls, _missing)
+                if value is _missing:
+                    value = self._values[cls] = self._observed_call(cls, stack)
+                return value
+        finally:
+            self._release_lock(cls, lock)
+
+    def _observed_call(self, cls, stack=None):
+        """Call _call, through the instrumentation observer if there is one. Values loaded
+        rather than computed by _call, e.g., from disk, are observed too.
+        """
+        if _observer is None:
+            return self._call(cls, stack)
+        return _observer(self, cls, stack)
+
+    def _call(self, cls, stack=None):
+        """Call the decorated method, recording any uncomputed constants it reads."""
+        if stack is None:
+            stack = _computing.__dict__.setdefault("stack", [])
+        reads = set()
+        stack.append(reads)
+        try:
+            return self.method(cls)
+        finally:
+            stack.pop()
+            if reads:
+                self._dependencies[cls] = frozenset(reads)
+
+    def _is_computed(self, cls):
+        return cls in self._values
+
+    def _store(self, cls, value):
+        """Store a value computed elsewhere, unless one is already present."""
+        with self._lock:
+            self._values.setdefault(cls, value)
+
+    def _record_dependencies(self, cls, dependencies):
+        self._dependencies[cls] = frozenset(
+            (weakref.ref(c), name) for c, name in dependencies
+        )
+
+    def dependencies(self, cls):
+        """Return the (class, name) pairs of the constants that were computed while computing
+        this constant for `cls`. Constants that had already been computed are not included.
+        """
+        pairs = ((ref(), name) for ref, name in self._dependencies.get(cls, ()))
+        return {(c, name) for c, name in pairs if c is not None}
+
+
+class refreshable_constant(constant):
+    """A @constant whose value is recomputed once it is older than `ttl` seconds.
+
+        class Rates(ClassOnly):
+            @refreshable_constant(ttl=3600)
+            def table(cls):
+                return load_rates()
+
+    The first access computes the value as for @constant. After that, reads never block: a read
+    of a stale value returns it and starts recomputing it in a background thread. The new value
+    replaces the old one when it is ready. If the recomputation fails, the old value is kept for
+    another `ttl` seconds and the exception is reported through threading.excepthook.
+
+    Call `refresh` to recompute a value immediately.
+    """
+
+    def __init__(self, method=None, *, ttl):
+        self.ttl = ttl
+        if method is not None:
+            self(method)
+
+    def __call__(self, method):
+        super().__init__(method)
+        self._expires = weakref.WeakKeyDictionary()
+        self._refreshing = weakref.WeakSet()
+        return self
+
+    def __get__(self, instance, cls):
+        try:
+            value = self._values[cls]
+        except KeyError:
+            return self._compute(cls)
+        if time.monotonic() >= self._expires[cls]:
+            self._refresh_in_background(cls)
+        return value
+
+    def _call(self, cls, stack=None):
+        value = super()._call(cls, stack)
+        self._expires[cls] = time.monotonic() + self.ttl
+        return value
+
+    def _store(self, cls, value):
+        with self._lock:
+            if cls not in self._values:
+                self._expires[cls] = time.monotonic() + self.ttl
+                self._values[cls] = value
+
+    def refresh(self, cls):
+        """Recompute the value for `cls` and return it. Readers see the old value until the new
+        one is ready.
+        """
+        lock = self._lock_for(cls)
+        try:
+            with lock:
+                value = self._values[cls] = self._observed_call(cls)
+        finally:
+            self._release_lock(cls, lock)
+        return value
+
+    def _refresh_in_background(self, cls):
+        with self._lock:
+            if cls in self._refreshing:
+                return
+            self._refreshing.add(cls)
+        threading.Thread(
+            target=self._background_refresh,
+            args=(cls,),
+            name=f"refresh-{cls.__qualname__}.{self.name}",
+            daemon=True,
+        ).start()
+
+    def _background_refresh(self, cls):
+        try:
+            self.refresh(cls)
+        except BaseException:
+            self._expires[cls] = time.monotonic() + self.ttl
+            raise
+        finally:
+            self._refreshing.discard(cls)
+
+
+class persistent_constant(constant):
+    """A @constant whose values are also saved to disk, so that later processes can load them
+    instead of computing them again.
+
+        class Lookup(ClassOnly):
+            source = "tables/v2"
+
+            @persistent_constant(inputs=["source"])
+            def table(cls):
+                return build_table(cls.source)
+
+    Entries are keyed by the class's module and qualified name, the constant's name, and a hash
+    of the method's code and the values of the class attributes named in `inputs`. Changing the
+    method or an input makes the old entry stale; it is replaced the next time the value is
+    computed. Values are pickled, so they must be picklable and their repr must not depend on
+    anything that varies between processes if they are used as inputs.
+
+    Array-like values, such as NumPy arrays, are memory-mapped read-only when loaded rather than
+    unpickled into memory.
+
+    Entries are stored in `cache_dir`, which defaults to the CLASS_ONLY_DESIGN_CACHE_DIR
+    environment variable, or ~/.cache/class_only_design.
+    """
+
+    def __init__(self, method=None, *, inputs=(), cache_dir=None):
+        self.inputs = tuple(inputs)
+        self.cache_dir = cache_dir
+        if method is not None:
+            self(method)
+
+    def __call__(self, method):
+        super().__init__(method)
+        self._code_hash = _code_hash(method)
+        return self
+
+    def _directory(self):
+        import pathlib
+
+        if self.cache_dir is not None:
+            return pathlib.Path(self.cache_dir)
+        return pathlib.Path(
+            os.environ.get("CLASS_ONLY_DESIGN_CACHE_DIR")
+            or pathlib.Path.home() / ".cache" / "class_only_design"
+        )
+
+    def _path(self, cls):
+        """Return the entry path for `cls`, and the prefix shared by all of its versions."""
+        import hashlib
+        import re
+
+        digest = hashlib.sha256(self._code_hash)
+        for name in self.inputs:
+            digest.update(name.encode())
+            digest.update(repr(getattr(cls, name)).encode())
+        prefix = re.sub(
+            r"[^\w.-]", "_", f"{cls.__module__}.{cls.__qualname__}.{self.name}"
+        )
+        return self._directory() / f"{prefix}-{digest.hexdigest()[:32]}.pkl", prefix
+
+    def _call(self, cls, stack=None):
+        import glob
+
+        from class_only_design import storage
+
+        path, prefix = self._path(cls)
+        try:
+            return storage.read(path)
+        except Exception:
+            # Missing, corrupt or unloadable entries are computed and written again
+            pass
+        value = super()._call(cls, stack)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        storage.write(path, value)
+        for stale in path.parent.glob(f"{glob.escape(prefix)}-*.pkl"):
+            if stale != path:
+                with contextlib.suppress(OSError):
+                    stale.unlink()
+        return value
+
+
+def _code_hash(function):
+    """Return a hash of a function's code, including any nested functions."""
+    import hashlib
+    import inspect
+
+    digest = hashlib.sha256()
+    pending = [inspect.unwrap(function).__code__]
+    while pending:
+        code = pending.pop()
+        digest.update(code.co_code)
+        digest.update(repr(code.co_names).encode())
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                pending.append(const)
+            else:
+                digest.update(repr(const).encode())
+    return digest.digest()
+
+
+class installed_constant(constant):
+    """A @constant that, once computed for a class, is stored in that class's __dict__ as a plain
+    class attribute. Later reads are ordinary attribute lookups that don't involve the
+    descriptor at all.
+
+    As with @constant, the method is called once per class and the class stays immutable.
+    Subclasses still compute their own values: when a value is installed on a class, its
+    subclasses, existing and future, get their own copy of the descriptor.
+    """
+
+    def _compute(self, cls):
+        value = super()._compute(cls)
+        self._install(cls, value)
+        return value
+
+    def _store(self, cls, value):
+        super()._store(cls, value)
+        # A value computed elsewhere, e.g., by warm or restore, is installed too
+        self._install(cls, self._values[cls])
+
+    def _install(self, cls, value):
+        with self._lock:
+            if cls.__dict__.get(self.name, _missing) is not value:
+                meta.install_value(cls, self.name, value, self)
+
+
+class shared_memory_constant(constant):
+    """A @constant whose value is computed by one process and shared, without copying, by the
+    others on the same machine.
+
+    The first process to compute a value publishes it in a memory-mapped file, in /dev/shm where
+    available. Other processes map that file instead of computing the value again. Values are
+    pickled, and out-of-band buffers, such as the data of a NumPy array or a
+    pickle.PickleBuffer, are mapped read-only rather than copied; everything else is unpickled
+    into each process. The publishing process gets the mapped value too, so every process sees
+    the same read-only data.
+
+    Processes share values if they have the same CLASS_ONLY_DESIGN_SHARED_SESSION environment
+    variable. It is set when the first shared_memory_constant is created, so child processes
+    inherit it whether they are started with fork or spawn, as long as the class is defined in
+    the parent before they start. The file is removed when the process that published it exits;
+    processes that have already mapped it keep their mapping.
     """
 
     def __init__(self, method):
+        import secrets
+
+        super().__init__(method)
+        self._code_hash = _code_hash(method)
+        os.environ.setdefault(
+            "CLASS_ONLY_DESIGN_SHARED_SESSION", f"{os.getpid()}-{secrets.token_hex(4)}"
+        )
+
+    def _path(self, cls):
+        import hashlib
+        import tempfile
+
+        directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        session = os.environ["CLASS_ONLY_DESIGN_SHARED_SESSION"]
+        key = f"{cls.__module__}.{cls.__qualname__}.{self.name}"
+        # Include the code, so that processes running different versions don't share values
+        digest = hashlib.sha256(key.encode() + self._code_hash).hexdigest()[:32]
+        return os.path.join(directory, f"class_only_design-{session}-{digest}")
+
+    def _call(self, cls, stack=None):
+        import multiprocessing.util
+
+        from class_only_design import storage
+
+        path = self._path(cls)
+        while True:
+            try:
+                return storage.read(path)
+            except FileNotFoundError:
+                # Not published yet, or its publisher has exited and removed it since
+                pass
+            with storage.locked(path + ".lock"):
+                # Another process may have published while we waited
+                if not os.path.exists(path):
+                    value = super()._call(cls, stack)
+                    storage.write(path, value)
+                    # Finalize, unlike atexit, also runs when multiprocessing workers exit, and
+                    # ignores copies inherited by forked children
+                    multiprocessing.util.Finalize(
+                        None, _remove_files, args=(path, path + ".lock"), exitpriority=0
+                    )
+
+
+def _remove_files(*paths):
+    for path in paths:
+        with contextlib.suppress(OSError):
+            os.unlink(path)
+
+
+class evictable_constant(constant):
+    """A @constant whose values can be evicted to stay within a memory budget shared by every
+    evictable constant in the process, see class_only_design.budget.
+
+        class Lookup(ClassOnly):
+            @evictable_constant
+            def index(cls):
+                return build_index()
+
+    When the total approximate size of the stored values exceeds the budget, the least recently
+    read values are evicted. An evicted value is computed again, as for @constant, the next time
+    it's read. Sizes are measured with `sizeof`, which defaults to util.approximate_size.
+
+    `evictions` and `recomputes` count how often this constant's values were evicted and
+    computed again.
+    """
+
+    def __init__(self, method=None, *, sizeof=None):
+        self.sizeof = sizeof or util.approximate_size
+        if method is not None:
+            self(method)
+
+    def __call__(self, method):
+        super().__init__(method)
+        self.evictions = 0
+        self.recomputes = 0
+        # Sizes of values computed but not yet added to the budget
+        self._sizes = weakref.WeakKeyDictionary()
+        self._evicted = weakref.WeakSet()
+        return self
+
+    def __get__(self, instance, cls):
+        try:
+            value = self._data[_ref(cls)]
+        except KeyError:
+            return self._compute(cls)
+        budget._budget.touch(self, cls)
+        return value
+
+    def _call(self, cls, stack=None):
+        value = super()._call(cls, stack)
+        if cls in self._evicted:
+            self._evicted.discard(cls)
+            with budget._budget.lock:
+                self.recomputes += 1
+                budget._budget.recomputes += 1
+        self._sizes[cls] = self.sizeof(value)
+        return value
+
+    def _compute(self, cls):
+        value = super()._compute(cls)
+        # Added to the budget once the class's lock is released, so that evicting other values
+        # never waits for a computation. Whichever thread gets here first adds it.
+        size = self._sizes.pop(cls, None)
+        if size is not None:
+            budget._budget.add(self, cls, size)
+        return value
+
+    def _store(self, cls, value):
+        with self._lock:
+            if cls in self._values:
+                return
+            self._values[cls] = value
+        budget._budget.add(self, cls, self.sizeof(value))
+
+    def _evict(self, cls):
+        with self._lock:
+            if self._values.pop(cls, _missing) is _missing:
+                return
+            self._evicted.add(cls)
+            self.evictions += 1
+
+
+class async_constant(constant):
+    """An awaitable counterpart to @constant, for coroutine methods.
+
+    The first access on a class schedules the coroutine as a task and returns it. Every
+    subsequent access returns the same task, so concurrent awaiters share a single computation.
+    Once the task has finished, awaiting it returns the value without yielding to the event loop.
+
+    If the coroutine raises or is cancelled, the task is discarded and the next access starts a
+    new one.
+    """
+
+    def __get__(self, instance, cls):
+        try:
+            return self._values[cls]
+        except KeyError:
+            pass
+        import asyncio
+
+        task = asyncio.ensure_future(self.method(cls))
+        self._values[cls] = task
+        task.add_done_callback(
+            functools.partial(self._discard_failed, weakref.ref(cls))
+        )
+        return task
+
+    def _discard_failed(self, cls_ref, task):
+        if not task.cancelled() and task.exception() is None:
+            return
+        cls = cls_ref()
+        if cls is not None and self._values.get(cls) is task:
+            del self._values[cls]
+
+
+CacheInfo = collections.namedtuple("CacheInfo", "hits misses maxsize currsize")
+
+# Separates positional from keyword arguments in memoized cache keys
+_kwargs_mark = object()
+
+
+class _MemoCache:
+    """The results of one memoized method for one class."""
+
+    __slots__ = ("results", "hits", "misses", "lock")
+
+    def __init__(self):
+        self.results = collections.OrderedDict()
+        self.hits = self.misses = 0
+        self.lock = threading.Lock()
+
+
+class memoized:
+    """A method decorator for class only classes that caches the results of a classmethod by its
+    arguments, keeping the `maxsize` most recently used results, or all of them if `maxsize` is
+    None.
+
+        class Methodology(ClassOnly):
+            @memoized(maxsize=1024)
+            def rate(cls, currency, date):
+                ...
+
+    Unlike functools.lru_cache on a classmethod, each class has its own cache, so a subclass
+    that overrides attributes the method reads gets its own results. Caches are stored against
+    weak references to their classes. Arguments must be hashable.
+
+    Reading the method from a class returns a callable with `cache_info()`, returning hit and
+    miss counts as a CacheInfo, and `cache_clear()`. It's safe to call from multiple threads,
+    but concurrent calls with the same uncached arguments may each compute the result, and hits
+    counted concurrently may be undercounted.
+    """
+
+    def __init__(self, method=None, *, maxsize=128):
+        self.maxsize = maxsize
+        if method is not None:
+            self(method)
+
+    def __call__(self, method):
         self.method = method
-        self._values = {}
+        self.name = method.__name__
+        # The bound method for each class, which holds that class's cache
+        self._bound = weakref.WeakKeyDictionary()
+        self._data = self._bound.data
+        self._lock = threading.Lock()
+        return self
 
     def __set_name__(self, owner, name):
         if not isinstance(owner, OnlyMeta):
             raise TypeError(
                 f"{type(self).__name__} can only be used with ClassOnly classes"
             )
+        self.name = name
 
     def __get__(self, instance, cls):
-        if cls not in self._values:
-            self._values[cls] = self.method(cls)
-        return self._values[cls]
+        try:
+            return self._data[_ref(cls)]
+        except KeyError:
+            with self._lock:
+                return self._bound.setdefault(cls, _MemoizedMethod(self, cls))
+
+
+class _MemoizedMethod:
+    """A memoized method bound to a class."""
+
+    __slots__ = ("_descriptor", "_cls", "_cache", "__weakref__")
+
+    def __init__(self, descriptor, cls):
+        self._descriptor = descriptor
+        # Weak, as this is stored against a weak reference to the class
+        self._cls = weakref.ref(cls)
+        self._cache = _MemoCache()
+
+    def __call__(self, *args, **kwargs):
+        key = args + (_kwargs_mark, *kwargs.items()) if kwargs else args
+        cache = self._cache
+        # Hits don't take the lock. The dict operations are atomic, but concurrent hits may
+        # occasionally be undercounted.
+        try:
+            result = cache.results[key]
+        except KeyError:
+            pass
+        else:
+            cache.hits += 1
+            try:
+                cache.results.move_to_end(key)
+            except KeyError:
+                # Evicted by another thread in the meantime
+                pass
+            return result
+        result = self._descriptor.method(self._cls(), *args, **kwargs)
+        maxsize = self._descriptor.maxsize
+        with cache.lock:
+            cache.misses += 1
+            cache.results[key] = result
+            if maxsize is not None and len(cache.results) > maxsize:
+                cache.results.popitem(last=False)
+        return result
+
+    def cache_info(self):
+        cache = self._cache
+        with cache.lock:
+            return CacheInfo(
+                cache.hits, cache.misses, self._descriptor.maxsize, len(cache.results)
+            )
+
+    def cache_clear(self):
+        cache = self._cache
+        with cache.lock:
+            cache.results.clear()
+            cache.hits = cache.misses = 0
+
+    @property
+    def __wrapped__(self):
+        return self._descriptor.method
+
+    def __repr__(self):
+        return f"<memoized method {self._cls().__qualname__}.{self._descriptor.name}>"
+
+
+def _definer(cls, name):
+    """Return the class in cls's mro whose __dict__ defines `name`, or None."""
+    for klass in cls.__mro__:
+        if name in vars(klass):
+            return klass
+    return None
+
+
+def _lookup_constant(cls, name):
+    """Return the constant descriptor that `cls.name` resolves to."""
+    for klass in cls.__mro__:
+        if name in vars(klass):
+            attr = vars(klass)[name]
+            if isinstance(attr, constant):
+                return attr
+            # The value of an installed_constant, stored in place of its descriptor
+            installed = vars(klass).get("_installed_constants_", {})
+            if name in installed:
+                return installed[name]
+            break
+    raise AttributeError(f"{cls.__name__}.{name} is not a constant")
+
+
+def refresh(cls, name):
+    """Recompute the refreshable constant `name` on `cls`."""
+    descriptor = _lookup_constant(cls, name)
+    if not isinstance(descriptor, refreshable_constant):
+        raise TypeError(f"{cls.__name__}.{name} is not refreshable")
+    return descriptor.refresh(cls)
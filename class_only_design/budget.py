@@ -0,0 +1,122 @@
+"""The memory budget shared by every evictable constant in the process.
+
+    from class_only_design import budget
+
+    budget.set_limit(512 * 2**20)
+    ...
+    print(budget.stats())
+
+When the total approximate size of the values of evictable constants exceeds the limit, the least
+recently used values are evicted until it doesn't. An evicted value is computed again the next
+time it's read. The limit defaults to the CLASS_ONLY_DESIGN_MEMORY_BUDGET environment variable, in
+bytes, and is unlimited if that isn't set.
+"""
+
+import collections
+import os
+import threading
+import weakref
+
+BudgetStats = collections.namedtuple(
+    "BudgetStats", "limit used values evictions recomputes"
+)
+BudgetStats.__doc__ = """The state of the memory budget. `used` is the total size in bytes of the
+`values` currently held. `evictions` and `recomputes` count values evicted and computed again
+after eviction, across all evictable constants."""
+
+
+class _Budget:
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.evictions = 0
+        self.recomputes = 0
+        # (descriptor, weakref to class) -> size, least recently used first
+        self.entries = collections.OrderedDict()
+        # Keys whose class has been collected. Weakref callbacks run during garbage collection,
+        # possibly while this thread holds the lock, so they queue keys here instead of taking it
+        self.pending_removals = []
+        self.lock = threading.Lock()
+
+    def touch(self, descriptor, cls):
+        try:
+            with self.lock:
+                self._remove_dead()
+                self.entries.move_to_end((descriptor, weakref.ref(cls)))
+        except KeyError:
+            pass
+
+    def add(self, descriptor, cls, size):
+        """Account for a newly stored value, then evict values until the budget is met. The new
+        value is never evicted by its own addition.
+        """
+        key = (descriptor, weakref.ref(cls, self._discard_dead(descriptor)))
+        with self.lock:
+            self._remove_dead()
+            self.used += size - self.entries.pop(key, 0)
+            self.entries[key] = size
+            evicted = self._over_budget(key)
+        for descriptor, ref in evicted:
+            c = ref()
+            if c is not None:
+                descriptor._evict(c)
+
+    def _over_budget(self, newest):
+        evicted = []
+        while (
+            self.limit is not None and self.used > self.limit and len(self.entries) > 1
+        ):
+            key, size = self.entries.popitem(last=False)
+            if key == newest:
+                self.entries[key] = size
+                continue
+            self.used -= size
+            self.evictions += 1
+            evicted.append(key)
+        return evicted
+
+    def _discard_dead(self, descriptor):
+        def callback(ref):
+            self.pending_removals.append((descriptor, ref))
+
+        return callback
+
+    def _remove_dead(self):
+        """Forget the entries of collected classes. Must be called with the lock held."""
+        while self.pending_removals:
+            self.used -= self.entries.pop(self.pending_removals.pop(), 0)
+
+
+def _default_limit():
+    limit = os.environ.get("CLASS_ONLY_DESIGN_MEMORY_BUDGET")
+    return int(limit) if limit else None
+
+
+_budget = _Budget(_default_limit())
+
+
+def set_limit(limit):
+    """Set the memory budget to `limit` bytes, or None for no limit, evicting least recently used
+    values if they no longer fit.
+    """
+    with _budget.lock:
+        _budget._remove_dead()
+        _budget.limit = limit
+        evicted = _budget._over_budget(None)
+    for descriptor, ref in evicted:
+        c = ref()
+        if c is not None:
+            descriptor._evict(c)
+
+
+def stats():
+    """Return the current `BudgetStats`."""
+    with _budget.lock:
+        _budget._remove_dead()
+        return BudgetStats(
+            _budget.limit,
+            _budget.used,
+            len(_budget.entries),
+            _budget.evictions,
+            _budget.recomputes,
+        )
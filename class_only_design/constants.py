@@ -3,3 +3,4 @@
 RESERVED_NAMES = {"nameof"}
 
 autoname = object()
+autoflag = object()
@@ -0,0 +1,92 @@
+"""Combining and decoding bit flag namespaces.
+
+A flag is a member whose value is a positive power of two, such as the members created with
+`autoflag`. A mask is an int made by combining flags with |. The decoding table for each
+namespace class is built on first use.
+"""
+
+import weakref
+
+from class_only_design import vectorized
+
+# Per namespace class (bit, name) tables, built on first use
+_tables = weakref.WeakKeyDictionary()
+
+
+def is_flag(value):
+    return (
+        isinstance(value, int)
+        and not isinstance(value, bool)
+        and value > 0
+        and value & (value - 1) == 0
+    )
+
+
+def _table(cls):
+    """Return a dict mapping each flag bit of `cls` to the name of its first member, and a mask
+    of all of them.
+    """
+    try:
+        return _tables[cls]
+    except KeyError:
+        pass
+    names = {}
+    for name, value in cls._members_.items():
+        if is_flag(value):
+            names.setdefault(value, name)
+    table = _tables[cls] = names, sum(names)
+    return table
+
+
+def combine(cls, flags):
+    """Return the mask combining `flags`, an iterable of member names or values."""
+    members = cls._members_
+    mask = 0
+    for flag in flags:
+        mask |= members[flag] if isinstance(flag, str) else flag
+    return mask
+
+
+def _check_mask(cls, mask, known):
+    if mask < 0 or mask & ~known:
+        raise ValueError(f"{mask!r} is not a combination of {cls.__name__} flags", mask)
+
+
+def decompose(cls, mask):
+    """Return the names of the flags set in `mask`, lowest bit first."""
+    names, known = _table(cls)
+    _check_mask(cls, mask, known)
+    result = []
+    while mask:
+        bit = mask & -mask
+        result.append(names[bit])
+        mask ^= bit
+    return result
+
+
+def decode_flags(cls, masks):
+    """Return a dict mapping each flag's name to a boolean array, of the same shape as `masks`,
+    that is True where the flag is set. Requires numpy.
+    """
+    np = vectorized._numpy()
+    names, known = _table(cls)
+    masks = np.asarray(masks)
+    if masks.dtype.kind not in "iu":
+        raise TypeError(f"Masks must be integers, not {masks.dtype}")
+    bits = 8 * masks.dtype.itemsize
+    # The largest value the dtype holds. Flags above it can't be set in any mask
+    limit = (1 << bits) - 1 if masks.dtype.kind == "u" else (1 << (bits - 1)) - 1
+    bad = (masks < 0) | ((masks & masks.dtype.type(limit & ~known)) != 0)
+    if bad.any():
+        raise ValueError(
+            f"Masks are not combinations of {cls.__name__} flags",
+            np.unique(masks[bad]).tolist(),
+        )
+    return {
+        name: (
+            (masks & masks.dtype.type(bit)) != 0
+            if bit <= limit
+            else np.zeros(masks.shape, dtype=bool)
+        )
+        for bit, name in sorted(names.items())
+    }
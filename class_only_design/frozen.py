@@ -0,0 +1,83 @@
+"""Frozen, instance backed copies of namespace classes.
+
+Reading an attribute of a namespace class searches the class's mro. The frozen form of a
+namespace is an instance of a generated class with one slot per member, so reading a member is a
+slot read. It keeps the member names, values and iteration order, but none of the class
+behaviour: it can't be subclassed, and it isn't a namespace class.
+"""
+
+import threading
+import weakref
+
+# The frozen form of each namespace class, built on first use
+_frozen = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+class Frozen:
+    """Base class of frozen namespaces."""
+
+    __slots__ = ()
+
+    def __new__(cls, *args, **kwargs):
+        raise TypeError("Frozen namespaces cannot be instantiated")
+
+    def __setattr__(self, name, value):
+        raise TypeError("Frozen namespaces are immutable")
+
+    def __delattr__(self, name):
+        raise TypeError("Frozen namespaces are immutable")
+
+    def __iter__(self):
+        return iter(self._values_)
+
+    def __len__(self):
+        return len(self._values_)
+
+    def __reduce__(self):
+        return as_frozen, (self._namespace_(),)
+
+    def __repr__(self):
+        members = ", ".join(
+            f"{name}={value!r}" for name, value in zip(self.__slots__, self._values_)
+        )
+        return f"{type(self).__name__}({members})"
+
+
+def _build(cls):
+    # Not cls.as_mapping(), which a member of the same name would shadow
+    members = cls._members_
+    bad_names = [name for name in members if not name.isidentifier()]
+    if bad_names:
+        raise ValueError(
+            "Only namespaces whose member names are identifiers can be frozen",
+            bad_names,
+        )
+    frozen_class = type(
+        cls.__name__,
+        (Frozen,),
+        {
+            "__slots__": tuple(members),
+            "__module__": cls.__module__,
+            "__qualname__": f"{cls.__qualname__}.frozen",
+            "_values_": tuple(members.values()),
+            # Weak, so the frozen form doesn't keep its namespace alive
+            "_namespace_": weakref.ref(cls),
+        },
+    )
+    frozen = object.__new__(frozen_class)
+    for name, value in members.items():
+        object.__setattr__(frozen, name, value)
+    return frozen
+
+
+def as_frozen(cls):
+    """Return the frozen form of the namespace class `cls`, creating it on first use."""
+    try:
+        return _frozen[cls]
+    except KeyError:
+        pass
+    with _lock:
+        if cls not in _frozen:
+            _frozen[cls] = _build(cls)
+        return _frozen[cls]
@@ -0,0 +1,224 @@
+"""Opt-in instrumentation of constant computation cost and cache behaviour.
+
+    from class_only_design import instrument
+
+    instrument.enable()
+    ...
+    print(instrument.report())
+
+While enabled, every constant computation records its wall and CPU time, the thread that ran it,
+and the approximate size of its value; every access through a constant descriptor is counted.
+Loading a value rather than computing it, as persistent and shared memory constants do, counts
+as a computation. Async constants are not instrumented.
+Statistics are grouped by the class's qualified name and the constant's name. Pass a `sink` to
+`enable` to receive a `ComputeEvent` for each computation, e.g., to forward them to a metrics
+system.
+
+When instrumentation is disabled, constant access runs exactly the code it would if this module
+had never been imported. Enabling it wraps the __get__ methods of the constant classes that exist
+at that time, so constant subclasses defined afterwards only report computations, not accesses.
+Constants installed as plain class attributes are not accessed through a descriptor, so their
+reads are not counted.
+"""
+
+import collections
+import json
+import threading
+import time
+import tracemalloc
+
+from class_only_design import api
+from class_only_design import util
+
+ComputeEvent = collections.namedtuple(
+    "ComputeEvent", "class_name name wall_time cpu_time thread size"
+)
+ComputeEvent.__doc__ = "A single constant computation."
+
+ConstantStats = collections.namedtuple(
+    "ConstantStats",
+    "class_name name hits misses wall_time cpu_time thread size",
+)
+ConstantStats.__doc__ = """Accumulated statistics for one constant on one class. `misses` counts
+computations, and the times are their totals. `thread` and `size` describe the most recent."""
+
+
+class _Stats:
+    __slots__ = ("hits", "misses", "wall_time", "cpu_time", "thread", "size")
+
+    def __init__(self):
+        self.hits = self.misses = 0
+        self.wall_time = self.cpu_time = 0.0
+        self.thread = None
+        self.size = 0
+
+
+_lock = threading.Lock()
+_stats = {}
+_sink = None
+_trace_memory = False
+# Whether enable started tracemalloc, so that disable stops it
+_started_tracemalloc = False
+# The number of computations run by each thread, to tell hits from misses
+_local = threading.local()
+# The original __get__ of each constant class we've wrapped
+_originals = {}
+
+
+def _key(descriptor, cls):
+    return f"{cls.__module__}.{cls.__qualname__}", descriptor.name
+
+
+def _stats_for(key):
+    try:
+        return _stats[key]
+    except KeyError:
+        with _lock:
+            return _stats.setdefault(key, _Stats())
+
+
+def _observe(descriptor, cls, stack):
+    if _trace_memory:
+        before = tracemalloc.get_traced_memory()[0]
+    start_wall = time.perf_counter()
+    start_cpu = time.thread_time()
+    value = descriptor._call(cls, stack)
+    cpu_time = time.thread_time() - start_cpu
+    wall_time = time.perf_counter() - start_wall
+    if _trace_memory:
+        # Allocations by other threads in the meantime are attributed to this value too
+        size = max(tracemalloc.get_traced_memory()[0] - before, 0)
+    else:
+        size = util.approximate_size(value)
+
+    _local.computations = getattr(_local, "computations", 0) + 1
+    key = _key(descriptor, cls)
+    thread = threading.current_thread().name
+    stats = _stats_for(key)
+    with _lock:
+        stats.misses += 1
+        stats.wall_time += wall_time
+        stats.cpu_time += cpu_time
+        stats.thread = thread
+        stats.size = size
+    if _sink is not None:
+        _sink(ComputeEvent(*key, wall_time, cpu_time, thread, size))
+    return value
+
+
+def _counting(original):
+    def __get__(self, instance, cls):
+        before = getattr(_local, "computations", 0)
+        value = original(self, instance, cls)
+        if getattr(_local, "computations", 0) == before:
+            # Nothing was computed in this thread, so the value was already there
+            stats = _stats_for(_key(self, cls))
+            with _lock:
+                stats.hits += 1
+        return value
+
+    __get__.__wrapped__ = original
+    return __get__
+
+
+def _constant_classes():
+    """Return the constant classes whose accesses are counted. Async constants hand out tasks
+    without computing anything, so they are left out.
+    """
+    classes = [api.constant]
+    for klass in classes:
+        classes.extend(
+            c for c in klass.__subclasses__() if not issubclass(c, api.async_constant)
+        )
+    return classes
+
+
+def enable(sink=None, trace_memory=False):
+    """Start recording constant statistics.
+
+    `sink`, if given, is called with a `ComputeEvent` after each computation. If `trace_memory`
+    is True, value sizes are measured with tracemalloc, which is started if it isn't already
+    tracing, rather than estimated by walking the value.
+    """
+    global _sink, _trace_memory, _started_tracemalloc
+    with _lock:
+        _sink = sink
+        _trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracemalloc = True
+        for klass in _constant_classes():
+            if "__get__" in vars(klass) and klass not in _originals:
+                _originals[klass] = vars(klass)["__get__"]
+                klass.__get__ = _counting(_originals[klass])
+        api._observer = _observe
+
+
+def disable():
+    """Stop recording, and stop tracemalloc if `enable` started it. Statistics recorded so far
+    are kept until `reset` is called.
+    """
+    global _sink, _trace_memory, _started_tracemalloc
+    with _lock:
+        api._observer = None
+        for klass, original in _originals.items():
+            klass.__get__ = original
+        _originals.clear()
+        _sink = None
+        _trace_memory = False
+        if _started_tracemalloc:
+            tracemalloc.stop()
+            _started_tracemalloc = False
+
+
+def enabled():
+    return api._observer is _observe
+
+
+def reset():
+    """Discard all recorded statistics."""
+    with _lock:
+        _stats.clear()
+
+
+def stats():
+    """Return a list of `ConstantStats`, most expensive first."""
+    with _lock:
+        result = [
+            ConstantStats(
+                class_name,
+                name,
+                s.hits,
+                s.misses,
+                s.wall_time,
+                s.cpu_time,
+                s.thread,
+                s.size,
+            )
+            for (class_name, name), s in _stats.items()
+        ]
+    return sorted(result, key=lambda s: s.wall_time, reverse=True)
+
+
+def export(fp=None):
+    """Return the statistics as a list of dicts. If `fp` is given, also write them to it as
+    JSON.
+    """
+    records = [s._asdict() for s in stats()]
+    if fp is not None:
+        json.dump(records, fp, indent=2)
+    return records
+
+
+def report():
+    """Return the statistics formatted as a table, most expensive first."""
+    lines = [
+        f"{'constant':50} {'hits':>8} {'misses':>6} {'wall s':>9} {'cpu s':>9} "
+        f"{'size B':>10}  thread"
+    ]
+    for s in stats():
+        lines.append(
+            f"{s.class_name + '.' + s.name:50} {s.hits:8d} {s.misses:6d} "
+            f"{s.wall_time:9.4f} {s.cpu_time:9.4f} {s.size:10d}  {s.thread}"
+        )
+    return "\n".join(lines)
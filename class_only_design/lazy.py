@@ -0,0 +1,210 @@
+"""Defer creating class only classes until they are first used.
+
+Class bodies run when their module is imported. For modules that define many large classes, of
+which a process only uses a few, the classes can be defined in functions instead. Either
+decorate each function with `lazy_class`, which replaces it with a proxy for the class it
+returns:
+
+    @lazy_class
+    def Currencies():
+        class Currencies(Namespace):
+            ...
+
+        return Currencies
+
+or give the functions to `module_getattr` and use the result as the module's __getattr__, so
+that the class is created, and stored as a module attribute, the first time it's imported or
+read:
+
+    __getattr__ = module_getattr(__name__, Currencies=_currencies, Rates=_rates)
+
+The second form hands out the class itself, so it can be pickled. Proxies forward attribute
+access, including __module__ and __doc__, iteration, len, `in`, subscription, instance and
+subclass checks, and can be used as base classes.
+
+To create classes as soon as they are defined, e.g., in tests, set the CLASS_ONLY_DESIGN_EAGER
+environment variable to 1 before importing, or call `force_eager`, which also creates any
+classes that are still pending.
+"""
+
+import os
+import sys
+import threading
+import weakref
+
+from class_only_design import meta
+
+_lock = threading.RLock()
+_eager = os.environ.get("CLASS_ONLY_DESIGN_EAGER", "") not in ("", "0")
+# Proxies and module __getattr__ functions with classes still to create, by id. Proxies hash
+# like their class, so they can't be hashed without creating it
+_pending = weakref.WeakValueDictionary()
+
+
+def force_eager():
+    """Create every pending lazy class, and create those defined later immediately."""
+    global _eager
+    with _lock:
+        _eager = True
+        for pending in list(_pending.values()):
+            pending._load_all_()
+
+
+def _build(factory, module, qualname):
+    cls = factory()
+    if "<locals>" in cls.__qualname__ and cls.__module__ == module:
+        # Name the class after where it will be published, for pickle and repr
+        meta._force_setattr(cls, "__qualname__", qualname)
+    return cls
+
+
+class _Forwarded(str):
+    """A string attribute in LazyClass's own __dict__, such as __module__ or __doc__, which would
+    otherwise answer for proxies instead of being forwarded to the class. It is still the string
+    for LazyClass itself, which reads __module__ without calling __get__.
+    """
+
+    def __new__(cls, name, value):
+        self = super().__new__(cls, value)
+        self.name = name
+        return self
+
+    def __get__(self, proxy, owner):
+        if proxy is None:
+            return str(self)
+        return getattr(proxy._resolve_(), self.name)
+
+    def __reduce__(self):
+        # Pickled as the plain string, e.g., as the module of LazyClass
+        return str, (str(self),)
+
+
+class LazyClass:
+    """A stand in for the class returned by a function, which is called on first use."""
+
+    __slots__ = ("_factory_", "_class_", "__weakref__")
+    __module__ = _Forwarded("__module__", __module__)
+    __doc__ = _Forwarded("__doc__", __doc__)
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory_", factory)
+        object.__setattr__(self, "_class_", None)
+
+    def _load_all_(self):
+        return self._resolve_()
+
+    def _resolve_(self):
+        cls = self._class_
+        if cls is not None:
+            return cls
+        with _lock:
+            if self._class_ is None:
+                factory = self._factory_
+                cls = _build(factory, factory.__module__, factory.__qualname__)
+                object.__setattr__(self, "_class_", cls)
+                object.__setattr__(self, "_factory_", None)
+                _pending.pop(id(self), None)
+            return self._class_
+
+    def __getattr__(self, name):
+        return getattr(self._resolve_(), name)
+
+    def __setattr__(self, name, value):
+        raise TypeError("Class Only classes are immutable")
+
+    def __delattr__(self, name):
+        raise TypeError("Class Only classes are immutable")
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve_()(*args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._resolve_())
+
+    def __len__(self):
+        return len(self._resolve_())
+
+    def __bool__(self):
+        # Like the class itself, without creating it
+        return True
+
+    def __contains__(self, value):
+        return value in self._resolve_()
+
+    def __getitem__(self, name):
+        return self._resolve_()[name]
+
+    def __dir__(self):
+        return dir(self._resolve_())
+
+    def __mro_entries__(self, bases):
+        return (self._resolve_(),)
+
+    def __instancecheck__(self, instance):
+        return isinstance(instance, self._resolve_())
+
+    def __subclasscheck__(self, subclass):
+        return issubclass(subclass, self._resolve_())
+
+    def __eq__(self, other):
+        if isinstance(other, LazyClass):
+            other = other._resolve_()
+        return self._resolve_() == other
+
+    def __hash__(self):
+        return hash(self._resolve_())
+
+    def __repr__(self):
+        cls = self._class_
+        if cls is None:
+            return f"<lazy class {self._factory_.__module__}.{self._factory_.__qualname__}>"
+        return repr(cls)
+
+
+def lazy_class(factory):
+    """Return a proxy for the class returned by `factory`, which is called on first use."""
+    if _eager:
+        return _build(factory, factory.__module__, factory.__qualname__)
+    proxy = LazyClass(factory)
+    _pending[id(proxy)] = proxy
+    return proxy
+
+
+class _ModuleGetattr:
+    """A module __getattr__ that creates classes on first access."""
+
+    def __init__(self, module, factories):
+        self.module = module
+        self.factories = dict(factories)
+
+    def __call__(self, name):
+        try:
+            factory = self.factories[name]
+        except KeyError:
+            raise AttributeError(
+                f"module {self.module!r} has no attribute {name!r}"
+            ) from None
+        with _lock:
+            namespace = vars(sys.modules[self.module])
+            if name not in namespace:
+                namespace[name] = _build(factory, self.module, name)
+                if all(n in namespace for n in self.factories):
+                    _pending.pop(id(self), None)
+            return namespace[name]
+
+    def _load_all_(self):
+        for name in self.factories:
+            self(name)
+
+
+def module_getattr(module, **factories):
+    """Return a function to use as the __getattr__ of the module named `module`. Reading the
+    module attribute `name` calls `factories[name]` and stores the class it returns as that
+    attribute, so later reads don't call __getattr__.
+    """
+    getter = _ModuleGetattr(module, factories)
+    if _eager:
+        getter._load_all_()
+    else:
+        _pending[id(getter)] = getter
+    return getter
@@ -0,0 +1,119 @@
+"""Build nested namespace classes from configuration, creating sub-namespaces on demand.
+
+    Config = loader.load("Config", "reference.json")
+    Config.pricing.curves.default
+
+Every nested mapping becomes a namespace class, but each one is only created when it's first
+accessed. Iterating over a namespace, or anything else that needs all of its member values,
+creates its sub-namespaces first, so the result behaves like namespaces built eagerly with
+`Namespace.from_mapping`.
+"""
+
+import json
+import os
+import sys
+import threading
+import weakref
+
+from class_only_design import api
+from class_only_design import meta
+from class_only_design import util
+
+# Lookup tables for lazily loaded namespaces, built on first use
+_tables = weakref.WeakKeyDictionary()
+_lock = threading.RLock()
+
+
+class _LazySection:
+    """Stands in for a sub-namespace until it is first accessed."""
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+
+    def __set_name__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __get__(self, instance, cls):
+        return self.materialize()
+
+    def materialize(self):
+        with _lock:
+            owner = self.owner
+            current = owner.__dict__[self.name]
+            if current is not self:
+                # Created by another thread while we waited
+                return current
+            section = _build(
+                self.name,
+                self.mapping,
+                owner.__module__,
+                f"{owner.__qualname__}.{self.name}",
+            )
+            meta._force_setattr(owner, self.name, section)
+            return section
+
+
+class LazyMetaNamespace(meta.MetaNamespace):
+    """The metaclass of namespaces created by `load`. Member tables are built on first use,
+    creating any sub-namespaces that haven't been accessed yet.
+    """
+
+    @staticmethod
+    def _store_tables(created_class):
+        # Member names are known without creating sections, so nameof is built right away
+        names = dict.fromkeys(
+            k
+            for c in created_class.__mro__
+            if isinstance(c, meta.MetaNamespace)
+            for k in vars(c)
+            if not util._is_internal(k)
+        )
+        created_class.nameof = util.NameTable(created_class, names)
+
+    @property
+    def _members_(cls):
+        return _tables_for(cls)[0]
+
+    @property
+    def _value_index_(cls):
+        return _tables_for(cls)[1]
+
+
+def _tables_for(cls):
+    try:
+        return _tables[cls]
+    except KeyError:
+        pass
+    with _lock:
+        if cls not in _tables:
+            for c in cls.__mro__:
+                for attr in list(vars(c).values()):
+                    if isinstance(attr, _LazySection):
+                        attr.materialize()
+            members = meta.MetaNamespace._collect_members(cls)
+            _tables[cls] = members, meta.MetaNamespace._index_values(members)
+        return _tables[cls]
+
+
+def _build(name, mapping, module, qualname):
+    members = {
+        k: _LazySection(v) if isinstance(v, dict) else v for k, v in mapping.items()
+    }
+    bases = (api.Namespace,)
+    classdict = meta._mapping_classdict(members, module, qualname, bases)
+    return LazyMetaNamespace(name, bases, classdict)
+
+
+def load(name, source, *, module=None):
+    """Create a namespace class called `name` from `source`, which is a mapping or the path of
+    a JSON file containing an object. Nested mappings become nested namespace classes, each
+    created when it is first accessed.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as f:
+            source = json.load(f)
+    if module is None:
+        # Like Namespace.from_mapping, attribute the class to the caller's module
+        module = sys._getframe(1).f_globals.get("__name__", "__main__")
+    return _build(name, source, module, name)
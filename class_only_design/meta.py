@@ -1,5 +1,21 @@
+import sys
+import threading
+import types
+import weakref
+
 from class_only_design import constants
+from class_only_design import flags
+from class_only_design import frozen
 from class_only_design import util
+from class_only_design import vectorized
+
+_missing = object()
+
+# Serializes the library's own writes to class only classes after their creation
+_setattr_lock = threading.Lock()
+
+# Classes that have had a value installed over an inherited descriptor, see install_value
+_installed_owners = weakref.WeakSet()
 
 # This is inserted into decorated classes. Note, __new__ is implicitly converted to a staticmethod
 # during class creation. I'm doing so explicitly here so I have a reference I can check later. This
@@ -20,7 +36,7 @@ class OnlyMeta(type):
 
         # Disallow bases that have __new__ or __init__ defined
         for b in bases:
-            if not isinstance(b, cls):
+            if not isinstance(b, OnlyMeta):
                 if b.__init__ is not object.__init__:
                     raise TypeError("Class Only classes cannot define __init__", b)
                 if b.__new__ is not object.__new__:
@@ -28,21 +44,106 @@ class OnlyMeta(type):
 
         # Insert our own __new__
         classdict["__new__"] = __new__
-        return super().__new__(cls, name, bases, classdict, **kwargs)
+        created_class = super().__new__(cls, name, bases, classdict, **kwargs)
+        if _installed_owners:
+            _pin_installed(created_class)
+        return created_class
 
     def __setattr__(cls, name, arg):
-        if not getattr(cls, "_initializing_", False):
+        # Only a class's own _initializing_ counts, so subclasses stay immutable while it is set
+        if not cls.__dict__.get("_initializing_", False):
             raise TypeError("Class Only classes are immutable")
         return super().__setattr__(name, arg)
 
 
+def _force_setattr(cls, name, value):
+    """Set an attribute on an already created class only class. This bypasses
+    OnlyMeta.__setattr__ rather than relaxing it, so that other threads can't set attributes
+    meanwhile.
+    """
+    with _setattr_lock:
+        type.__setattr__(cls, name, value)
+
+
+def _inherits_through(cls, name, ancestor):
+    """Return True if `cls.name` would resolve to `ancestor`'s __dict__ if it had an entry there,
+    i.e., no class before `ancestor` in cls's mro defines `name`.
+    """
+    for c in cls.__mro__:
+        if c is ancestor:
+            return True
+        if name in c.__dict__:
+            return False
+    return False
+
+
+def install_value(cls, name, value, descriptor):
+    """Store `value` in cls's __dict__ under `name`, replacing `descriptor` if it is there, so that
+    reading `cls.name` is a plain attribute lookup.
+
+    Subclasses that inherited the descriptor through `cls` must keep computing their own values,
+    so the descriptor is copied into those that already exist, and into any created later.
+    """
+    for subclass in cls.__subclasses__():
+        if _inherits_through(subclass, name, cls):
+            _force_setattr(subclass, name, descriptor)
+    installed = dict(cls.__dict__.get("_installed_constants_", {}))
+    installed[name] = descriptor
+    _force_setattr(cls, "_installed_constants_", installed)
+    _installed_owners.add(cls)
+    _force_setattr(cls, name, value)
+
+
+def _pin_installed(created_class):
+    """Copy the descriptors for values installed on our ancestors into a newly created class, where
+    it would otherwise inherit the installed value.
+    """
+    for c in created_class.__mro__[1:]:
+        for name, descriptor in c.__dict__.get("_installed_constants_", {}).items():
+            if _inherits_through(created_class, name, c):
+                _force_setattr(created_class, name, descriptor)
+
+
+def _inherited_values(bases):
+    """Return an iterator over the member values a namespace class with `bases` inherits."""
+    return (
+        v for b in bases if isinstance(b, MetaNamespace) for v in b._members_.values()
+    )
+
+
+def _mapping_classdict(mapping, module, qualname, bases):
+    """Return a namespace class body with the items of `mapping` as its members, checking that
+    their names are allowed.
+    """
+    ids = set(map(id, mapping.values()))
+    if id(constants.autoname) in ids or id(constants.autoflag) in ids:
+        loader = util.NamespaceLoader(_inherited_values(bases))
+        for k, v in mapping.items():
+            loader[k] = v
+        classdict = dict(loader)
+    else:
+        classdict = dict(mapping)
+    if set(map(type, classdict)) <= {str}:
+        internal = util._internal_names(classdict)
+    else:
+        internal = {
+            k for k in classdict if not isinstance(k, str) or util._is_internal(k)
+        }
+    if internal:
+        bad_names = [k for k in classdict if k in internal]
+        raise ValueError("Cannot create namespace class with internal names", bad_names)
+    classdict["__module__"] = module
+    classdict["__qualname__"] = qualname
+    return classdict
+
+
 class MetaNamespace(OnlyMeta):
     def __new__(cls, name, bases, classdict):
         # disallow reserved names
         bad_names = classdict.keys() & constants.RESERVED_NAMES
 
         for b in bases:
-            if not isinstance(b, cls):
+            if not isinstance(b, MetaNamespace):
                 bad_names |= vars(b).keys() & constants.RESERVED_NAMES
         if bad_names:
             raise ValueError(
@@ -50,21 +151,217 @@ class MetaNamespace(OnlyMeta):
             )
         classdict['_initializing_'] = True
         created_class = super().__new__(cls, name, bases, classdict)
-        created_class.nameof = util.KeyGetter(created_class)
+        cls._store_tables(created_class)
         del created_class._initializing_
         return created_class
 
+    @staticmethod
+    def _store_tables(created_class):
+        """Build the lookup tables for a newly created namespace class and store them on it."""
+        created_class._members_ = MetaNamespace._collect_members(created_class)
+        created_class._value_index_ = MetaNamespace._index_values(
+            created_class._members_
+        )
+        created_class.nameof = util.NameTable(created_class, created_class._members_)
+
+    @staticmethod
+    def _collect_members(created_class):
+        """Return a read-only, ordered mapping of the members of `created_class`. Namespace classes
+        are immutable, so this is done once at class creation.
+        """
+        # mappingproxy.copy() copies the underlying dict directly, dict() would not
+        members = vars(created_class).copy()
+        for k in util._internal_names(members):
+            del members[k]
+        namespace_bases = [
+            c for c in created_class.__mro__[1:] if isinstance(c, MetaNamespace)
+        ]
+        if not namespace_bases:
+            return types.MappingProxyType(members)
+
+        # In the common case the namespace classes in our mro are exactly those in our first
+        # namespace base's mro, and that base has already collected their members for us
+        parent = namespace_bases[0]
+        if namespace_bases[1:] == [
+            c for c in parent.__mro__[1:] if isinstance(c, MetaNamespace)
+        ]:
+            # Our own members come first and win. Dicts keep the position of a key's first
+            # insertion, so this is done without a Python level loop
+            return types.MappingProxyType(
+                {**members, **parent._members_.copy(), **members}
+            )
+
+        # Otherwise walk up the mro, looking for namespace classes. Keep track of attrs we've
+        # already seen and don't re-yield their values
+        for c in namespace_bases:
+            for k, v in vars(c).items():
+                if k not in members and not util._is_internal(k):
+                    members[k] = v
+        return types.MappingProxyType(members)
+
+    @staticmethod
+    def _index_values(members):
+        """Return a dict mapping each hashable member value to its name, and a tuple of the
+        (name, value) pairs for members that are unhashable. If several members share a value,
+        the first in iteration order wins.
+        """
+        try:
+            # Inserting in reverse lets the first member with a value overwrite the rest
+            return dict(zip(reversed(members.values()), reversed(members.keys()))), ()
+        except TypeError:
+            pass
+        index = {}
+        unhashable = []
+        for k, v in members.items():
+            try:
+                index.setdefault(v, k)
+            except TypeError:
+                unhashable.append((k, v))
+        return index, tuple(unhashable)
+
     def __iter__(cls):
-        # Walk up the mro, looking for namespace classes. Keep track of attrs we've already seen
-        # and don't re-yield their values
-        seen_attrs = set()
-        for c in cls.__mro__:
-            if isinstance(c, MetaNamespace):
-                for k, v in vars(c).items():
-                    if not util._is_internal(k) and k not in seen_attrs:
-                        seen_attrs.add(k)
-                        yield v
+        return iter(cls._members_.values())
+
+    def __len__(cls):
+        return len(cls._members_)
+
+    def __bool__(cls):
+        # Classes are true, even when they have no members
+        return True
+
+    def __getitem__(cls, name):
+        # With keys(), this makes namespaces mappings of names to values, e.g., for dict()
+        return cls._members_[name]
+
+    def items(cls):
+        """Return a view of (name, value) pairs for every member of the namespace. A member
+        named `items` shadows this method; use `as_mapping().items()` instead.
+        """
+        return cls._members_.items()
+
+    def keys(cls):
+        """Return a view of the names of every member of the namespace. A member named `keys`
+        shadows this method; use `as_mapping().keys()` instead.
+        """
+        return cls._members_.keys()
+
+    def as_mapping(cls):
+        """Return a read-only mapping of member names to values, including inherited members.
+        The mapping is built once, when the class is created, and the same object is returned on
+        every call.
+        """
+        return cls._members_
+
+    def name_for(cls, value, default=_missing):
+        """Return the name of the member whose value is `value`.
+
+        If several members have the same value, the name of the first in iteration order is
+        returned, i.e., the most derived class's, in definition order. Values are compared as
+        dict keys are, so equal values that hash alike (such as 1 and True) are the same value.
+        Unhashable values are compared with ==. If no member has the value, `default` is
+        returned if given, otherwise ValueError is raised.
+        """
+        index, unhashable = cls._value_index_
+        try:
+            return index[value]
+        except (KeyError, TypeError):
+            pass
+        for k, v in unhashable:
+            if v == value:
+                return k
+        if default is not _missing:
+            return default
+        raise ValueError(f"{value!r} is not a member of {cls.__name__}")
+
+    def __contains__(cls, value):
+        index, unhashable = cls._value_index_
+        try:
+            if value in index:
+                return True
+        except TypeError:
+            pass
+        return any(v == value for _, v in unhashable)
+
+    def validate(cls, values):
+        """Check that every item of `values` is a member value, in a single pass. Raises
+        ValueError listing the (position, value) pairs of every item that isn't.
+        """
+        index, unhashable = cls._value_index_
+        values = list(values)
+        try:
+            invalid = [(i, v) for i, v in enumerate(values) if v not in index]
+        except TypeError:
+            # Some values are unhashable
+            invalid = [(i, v) for i, v in enumerate(values) if v not in cls]
+        else:
+            if unhashable:
+                invalid = [(i, v) for i, v in invalid if v not in cls]
+        if invalid:
+            raise ValueError(f"Values are not members of {cls.__name__}", invalid)
+
+    def encode(cls, values):
+        """Return a NumPy array of the integer codes for an array or sequence of member values.
+        A member's code is its position in iteration order. Raises ValueError listing every value
+        that isn't a member. Requires numpy.
+        """
+        return vectorized.encode(cls, values)
+
+    def decode(cls, codes):
+        """Return a NumPy array of the member values for an array or sequence of codes."""
+        return vectorized.decode(cls, codes)
+
+    def decode_names(cls, codes):
+        """Return a NumPy array of the member names for an array or sequence of codes."""
+        return vectorized.decode_names(cls, codes)
+
+    def combine(cls, *members):
+        """Return the int mask combining the flag `members`, given as names or values."""
+        return flags.combine(cls, members)
+
+    def decompose(cls, mask):
+        """Return the names of the flag members set in `mask`, lowest bit first. A flag member
+        is one whose value is a positive power of two. Raises ValueError if `mask` has bits that
+        aren't flags.
+        """
+        return flags.decompose(cls, mask)
+
+    def decode_flags(cls, masks):
+        """Return a dict mapping the name of each flag member to a NumPy boolean array that is
+        True where `masks`, an array or sequence of masks, has that flag set. Requires numpy.
+        """
+        return flags.decode_flags(cls, masks)
+
+    def as_frozen(cls):
+        """Return a frozen, immutable object with the same member names and values, whose
+        attributes are slots. Reading a member from it is faster than reading it from the class.
+        The object is created on first use and the same one returned on every call.
+        """
+        return frozen.as_frozen(cls)
+
+    def from_mapping(cls, name, mapping, *, bases=None, module=None):
+        """Create a namespace class called `name` whose members are the items of `mapping`.
+
+        The new class subclasses `bases`, which defaults to the class this is called on. Members
+        whose value is `autoname` take their name as their value, as in a class body. Names must
+        be strings that aren't internal to class_only_design.
+        """
+        if module is None:
+            # Like namedtuple, attribute the class to the caller's module
+            module = sys._getframe(1).f_globals.get("__name__", "__main__")
+        bases = (cls,) if bases is None else tuple(bases)
+        return type(cls)(name, bases, _mapping_classdict(mapping, module, name, bases))
+
+    def from_records(cls, name, records, *, bases=None, module=None):
+        """Create a namespace class called `name` from an iterable of (name, value) pairs. Later
+        pairs replace earlier pairs with the same name. See `from_mapping`.
+        """
+        if module is None:
+            module = sys._getframe(1).f_globals.get("__name__", "__main__")
+        # Through the metaclass, as a member called from_mapping would shadow the method
+        return type(cls).from_mapping(
+            cls, name, dict(records), bases=bases, module=module
+        )
 
     @classmethod
     def __prepare__(metacls, name, bases, **kwds):
-        return util.NamespaceLoader()
+        return util.NamespaceLoader(_inherited_values(bases))
@@ -0,0 +1,191 @@
+"""Tools for computing constants ahead of time, rather than on first use."""
+
+from class_only_design import api
+
+# Prefixed to snapshots. Bump the version whenever the snapshot format changes
+_SNAPSHOT_MAGIC = b"class_only_design snapshot"
+SNAPSHOT_VERSION = 1
+
+
+def _hierarchy(cls):
+    """Return `cls` and all of its subclasses, each exactly once."""
+    seen = {}
+    pending = [cls]
+    while pending:
+        c = pending.pop()
+        if c not in seen:
+            seen[c] = None
+            pending.extend(c.__subclasses__())
+    return list(seen)
+
+
+def find_constants(cls):
+    """Return a list of (class, name, descriptor) triples for every constant reachable from
+    `cls` and its subclasses. Async constants are not included.
+    """
+    found = []
+    for c in _hierarchy(cls):
+        names = set()
+        for klass in c.__mro__:
+            for name, attr in vars(klass).items():
+                if name in names:
+                    continue
+                names.add(name)
+                if isinstance(attr, api.constant) and not isinstance(
+                    attr, api.async_constant
+                ):
+                    found.append((c, name, attr))
+    return found
+
+
+def _compute(cls, name):
+    """Compute a single constant. Module level, so that it can be sent to a process pool."""
+    value = getattr(cls, name)
+    return value, api._lookup_constant(cls, name).dependencies(cls)
+
+
+def warm(cls, executor=None):
+    """Compute every constant reachable from `cls` and its subclasses.
+
+    Constants are computed on `executor`, which may be a thread or process pool. If it is None,
+    a thread pool is created for the duration of the call. Values computed in another process are
+    sent back and stored in this one.
+
+    Constants that read other constants are only submitted once those have been computed, so
+    independent constants run in parallel and dependent ones wait. Dependencies are learned as
+    constants are computed: each constant is computed for one class first, and the constants it
+    read on that class tell which ones it will read on the others. In a thread pool, a constant
+    that needs one still being computed elsewhere waits for it. In a process pool it is computed
+    again in the worker.
+
+    Returns a list of the (class, name) pairs that were computed.
+    """
+    import concurrent.futures
+
+    if executor is None:
+        with concurrent.futures.ThreadPoolExecutor() as pool:
+            return warm(cls, pool)
+
+    pending = {
+        (c, name): descriptor
+        for c, name, descriptor in find_constants(cls)
+        if not descriptor._is_computed(c)
+    }
+    # The first class each descriptor was computed for, and what that computation read
+    learned = {}
+    done = []
+    running = {}
+    try:
+        while pending or running:
+            waiting = pending.keys() | {key for key, _ in running.values()}
+            probing = {descriptor for _, descriptor in running.values()}
+            ready = []
+            for key, descriptor in pending.items():
+                expected = _expected_dependencies(key[0], descriptor, learned)
+                if expected is None:
+                    # Nothing is known yet, so compute it for this class first and learn
+                    if descriptor not in probing:
+                        ready.append(key)
+                        probing.add(descriptor)
+                elif not expected & waiting:
+                    ready.append(key)
+            if not ready and not running:
+                # Only reachable if the recorded dependencies form a cycle
+                ready = list(pending)
+            for key in ready:
+                descriptor = pending.pop(key)
+                running[executor.submit(_compute, *key)] = key, descriptor
+
+            finished, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in finished:
+                (c, name), descriptor = running.pop(future)
+                value, dependencies = future.result()
+                descriptor._store(c, value)
+                descriptor._record_dependencies(c, dependencies)
+                learned.setdefault(descriptor, (c, dependencies))
+                done.append((c, name))
+    finally:
+        for future in running:
+            future.cancel()
+    return done
+
+
+def _expected_dependencies(cls, descriptor, learned):
+    """Return the (class, name) pairs that computing `descriptor` for `cls` is expected to read,
+    assuming it reads the same constants on `cls` as it did on the first class it was computed
+    for, or None if it hasn't been computed yet.
+    """
+    known = descriptor.dependencies(cls)
+    if known:
+        return known
+    if descriptor not in learned:
+        return None
+    first, dependencies = learned[descriptor]
+    return {(cls if c is first else c, name) for c, name in dependencies}
+
+
+def _computed_values(cls):
+    """Yield (class, name, value, dependencies) for every computed constant reachable from `cls`
+    and its subclasses, including values installed as class attributes.
+    """
+    for c, name, descriptor in find_constants(cls):
+        value = descriptor._values.get(c, api._missing)
+        if value is not api._missing:
+            yield c, name, value, descriptor.dependencies(c)
+    for c in _hierarchy(cls):
+        for name, descriptor in c.__dict__.get("_installed_constants_", {}).items():
+            yield c, name, c.__dict__[name], descriptor.dependencies(c)
+
+
+def snapshot(cls):
+    """Return the values of every constant computed so far on `cls` and its subclasses, as bytes
+    that `restore` can load in another process.
+
+    Values are pickled with protocol 5, and out-of-band buffers, such as the data of NumPy
+    arrays, are stored after the pickle so that `restore` can use them without copying. The
+    classes are pickled by reference, so they must be importable by the process that restores
+    the snapshot. Use `restore` as a process pool's initializer so that each worker starts with
+    the constants already computed:
+
+        data = snapshot(Pricing)
+        pool = ProcessPoolExecutor(initializer=restore, initargs=(data,))
+    """
+    from class_only_design import storage
+
+    entries = [
+        (c, name, value, list(dependencies))
+        for c, name, value, dependencies in _computed_values(cls)
+    ]
+    header = _SNAPSHOT_MAGIC + SNAPSHOT_VERSION.to_bytes(2, "little")
+    return header + storage.dumps(entries)
+
+
+def restore(data):
+    """Store the constant values in a snapshot made by `snapshot`. Constants that have already
+    been computed in this process keep their values. Arrays and other out-of-band buffers in the
+    snapshot are read-only views onto `data`.
+
+    Returns a list of the (class, name) pairs in the snapshot.
+    """
+    from class_only_design import storage
+
+    data = memoryview(data)
+    magic = len(_SNAPSHOT_MAGIC)
+    if bytes(data[:magic]) != _SNAPSHOT_MAGIC:
+        raise ValueError("Not a constant snapshot")
+    version = int.from_bytes(data[magic : magic + 2], "little")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot version {version}, expected {SNAPSHOT_VERSION}"
+        )
+    restored = []
+    for c, name, value, dependencies in storage.loads(data[magic + 2 :]):
+        descriptor = api._lookup_constant(c, name)
+        if not descriptor._is_computed(c):
+            descriptor._store(c, value)
+            if dependencies:
+                descriptor._record_dependencies(c, dependencies)
+        restored.append((c, name))
+    return restored
@@ -0,0 +1,121 @@
+"""Reading and writing values to files that can be memory-mapped.
+
+Values are pickled with protocol 5. Out-of-band buffers, such as the data of NumPy arrays, are
+written after the pickle, aligned so that they can be mapped back in without copying. The layout
+is:
+
+    8 byte little endian header length
+    header: pickle of (pickled value, [(buffer offset, buffer length), ...])
+    padding
+    buffers, each starting at a multiple of ALIGNMENT from the start of the data section
+"""
+
+import contextlib
+import mmap
+import os
+import pickle
+import struct
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+ALIGNMENT = 64
+
+_LENGTH = struct.Struct("<Q")
+
+
+def _align(n):
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+
+def _layout(value):
+    """Pickle `value`, returning the encoded header, the raw out-of-band buffers, their offsets
+    relative to the data section, and the offset of the data section.
+    """
+    buffers = []
+    data = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+    raws = [b.raw() for b in buffers]
+    offsets = []
+    position = 0
+    for raw in raws:
+        position = _align(position)
+        offsets.append((position, raw.nbytes))
+        position += raw.nbytes
+    header = pickle.dumps((data, offsets), protocol=5)
+    start = _align(_LENGTH.size + len(header))
+    return _LENGTH.pack(len(header)) + header, raws, offsets, start
+
+
+def _load(view, start, data, offsets):
+    buffers = [view[start + offset : start + offset + n] for offset, n in offsets]
+    return pickle.loads(data, buffers=buffers)
+
+
+def write(path, value):
+    """Atomically write `value` to `path`."""
+    import tempfile
+
+    header, raws, offsets, start = _layout(value)
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            for raw, (offset, _) in zip(raws, offsets):
+                f.seek(start + offset)
+                f.write(raw)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def read(path):
+    """Read a value written by `write`. Out-of-band buffers are memory-mapped read-only, so
+    array-like values are views onto the file rather than copies.
+    """
+    with open(path, "rb") as f:
+        (size,) = _LENGTH.unpack(f.read(_LENGTH.size))
+        data, offsets = pickle.loads(f.read(size))
+        if not offsets:
+            return pickle.loads(data)
+        view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return _load(view, _align(_LENGTH.size + size), data, offsets)
+
+
+def dumps(value):
+    """Return `value` encoded as bytes, in the same layout as `write` uses for files."""
+    header, raws, offsets, start = _layout(value)
+    end = start + offsets[-1][0] + offsets[-1][1] if offsets else len(header)
+    result = bytearray(end)
+    result[: len(header)] = header
+    for raw, (offset, n) in zip(raws, offsets):
+        result[start + offset : start + offset + n] = raw
+    return bytes(result)
+
+
+def loads(data):
+    """Decode a value encoded by `dumps`. Out-of-band buffers are read-only views onto `data`
+    rather than copies.
+    """
+    view = memoryview(data).toreadonly()
+    (size,) = _LENGTH.unpack(view[: _LENGTH.size])
+    payload, offsets = pickle.loads(view[_LENGTH.size : _LENGTH.size + size])
+    return _load(view, _align(_LENGTH.size + size), payload, offsets)
+
+
+@contextlib.contextmanager
+def locked(path):
+    """Hold an exclusive lock on the file at `path`, creating it if necessary, to serialize work
+    between processes. Locking needs fcntl; where it isn't available this does nothing.
+    """
+    with open(path, "a+b") as f:
+        if fcntl is None:  # pragma: no cover
+            yield
+            return
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
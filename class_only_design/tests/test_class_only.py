@@ -4,10 +4,26 @@
 """Tests for `class_only` package."""
 
 
+import asyncio
+import gc
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 from class_only_design import ClassOnly
 from class_only_design import constant
+from class_only_design import async_constant
+from class_only_design import refreshable_constant
+from class_only_design import refresh
+from class_only_design import installed_constant
+from class_only_design import evictable_constant
+from class_only_design import budget
+from class_only_design import memoized
+from class_only_design import Namespace
 
 
 class TestClassOnly(unittest.TestCase):
@@ -102,6 +118,173 @@ class TestClassOnly(unittest.TestCase):
         assert B.name == "B"
         assert C.name == "C"
 
+    def test_constant_single_flight(self):
+        calls = 0
+        barrier = threading.Barrier(16)
+
+        class A(ClassOnly):
+            @constant
+            def slow(cls):
+                nonlocal calls
+                calls += 1
+                time.sleep(0.05)
+                return object()
+
+        def read():
+            barrier.wait()
+            return A.slow
+
+        with ThreadPoolExecutor(16) as pool:
+            results = list(pool.map(lambda _: read(), range(16)))
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(len({id(r) for r in results}), 1)
+
+    def test_constant_failure_is_retried(self):
+        attempts = 0
+
+        class A(ClassOnly):
+            @constant
+            def flaky(cls):
+                nonlocal attempts
+                attempts += 1
+                if attempts == 1:
+                    raise ValueError
+                return attempts
+
+        with self.assertRaises(ValueError):
+            A.flaky
+        self.assertEqual(A.flaky, 2)
+        self.assertEqual(A.flaky, 2)
+
+    def test_unrelated_constants_do_not_serialize(self):
+        # Each constant waits for the other to start, so they fail unless they overlap
+        barrier = threading.Barrier(2, timeout=5)
+
+        class A(ClassOnly):
+            @constant
+            def one(cls):
+                barrier.wait()
+                return 1
+
+            @constant
+            def two(cls):
+                barrier.wait()
+                return 2
+
+        with ThreadPoolExecutor(2) as pool:
+            results = list(pool.map(lambda name: getattr(A, name), ["one", "two"]))
+        self.assertEqual(results, [1, 2])
+
+    def test_constant_does_not_keep_classes_alive(self):
+        class A(ClassOnly):
+            @constant
+            def payload(cls):
+                return [cls.__name__] * 10
+
+        def churn(count):
+            for i in range(count):
+                B = type(A)(f"B{i}", (A,), {})
+                B.payload
+            del B
+            gc.collect()
+
+        values = vars(A)["payload"]._values
+        churn(100_000)
+        self.assertEqual(len(values), 0)
+        self.assertEqual(A.__subclasses__(), [])
+
+        tracemalloc.start()
+        try:
+            churn(2000)
+            baseline, _ = tracemalloc.get_traced_memory()
+            churn(5000)
+            current, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # Allow a little slack for interpreter bookkeeping, far below the several MB that
+        # 5000 retained classes would take
+        self.assertLess(current - baseline, 500_000)
+
+    def test_shared_constant(self):
+        calls = []
+
+        class Template(ClassOnly):
+            @constant(shared=True)
+            def registry(cls):
+                calls.append(cls)
+                return {"name": cls.__name__}
+
+        subclasses = [type(Template)(f"S{i}", (Template,), {}) for i in range(200)]
+        for c in subclasses:
+            self.assertIs(c.registry, Template.registry)
+        self.assertEqual(calls, [Template])
+        self.assertEqual(Template.registry, {"name": "Template"})
+
+        # A subclass that redefines the constant has its own
+        class Override(Template):
+            @constant(shared=True)
+            def registry(cls):
+                return {"name": "override"}
+
+        class Below(Override):
+            pass
+
+        self.assertEqual(Below.registry, {"name": "override"})
+        self.assertIs(Below.registry, Override.registry)
+
+    def test_shared_constant_depends_on(self):
+        calls = []
+
+        class Template(ClassOnly):
+            columns = ("a", "b")
+            width = 2
+
+            @constant(depends_on=["columns", "width"])
+            def layout(cls):
+                calls.append(cls.__name__)
+                return cls.columns * cls.width
+
+        class Same(Template):
+            other = 1
+
+        class Wide(Template):
+            width = 3
+
+        class StillWide(Wide):
+            columns = Template.columns
+
+        class WideChild(Wide):
+            pass
+
+        self.assertEqual(Same.layout, ("a", "b") * 2)
+        self.assertIs(Same.layout, Template.layout)
+        self.assertEqual(WideChild.layout, ("a", "b") * 3)
+        self.assertIs(Wide.layout, WideChild.layout)
+        # Redefining an attribute, even with an equal value, isn't shared
+        self.assertEqual(StillWide.layout, ("a", "b") * 3)
+        self.assertEqual(calls, ["Template", "Wide", "StillWide"])
+
+    def test_shared_constant_single_flight(self):
+        calls = []
+        started = threading.Event()
+
+        class Template(ClassOnly):
+            @constant(shared=True)
+            def value(cls):
+                calls.append(cls)
+                started.wait(1)
+                return object()
+
+        subclasses = [type(Template)(f"S{i}", (Template,), {}) for i in range(8)]
+        with ThreadPoolExecutor(8) as pool:
+            futures = [pool.submit(getattr, c, "value") for c in subclasses]
+            started.set()
+            values = {id(f.result()) for f in futures}
+        self.assertEqual(len(values), 1)
+        self.assertEqual(calls, [Template])
+
     def test_inheritance_decorated(self):
         # test case where both classes have the @class_only decorator
         class X(ClassOnly):
@@ -215,3 +398,446 @@ class TestClassOnly(unittest.TestCase):
 
         class MySubclass(MyClass, kwarg1=1, kwarg2=2):
             pass
+
+
+class TestAsyncConstant(unittest.TestCase):
+    def test_async_constant(self):
+        calls = 0
+
+        class A(ClassOnly):
+            @async_constant
+            async def pool(cls):
+                nonlocal calls
+                calls += 1
+                await asyncio.sleep(0.01)
+                return cls.__name__
+
+        class B(A):
+            pass
+
+        async def main():
+            results = await asyncio.gather(*(A.pool for _ in range(10)), B.pool)
+            self.assertEqual(results, ["A"] * 10 + ["B"])
+            self.assertEqual(calls, 2)
+            # Resolved constants return a finished task
+            self.assertTrue(A.pool.done())
+            self.assertEqual(await A.pool, "A")
+
+        asyncio.run(main())
+        self.assertEqual(calls, 2)
+
+    def test_async_constant_failure_is_retried(self):
+        attempts = 0
+
+        class A(ClassOnly):
+            @async_constant
+            async def flaky(cls):
+                nonlocal attempts
+                attempts += 1
+                await asyncio.sleep(0)
+                if attempts == 1:
+                    raise ValueError
+                return attempts
+
+        async def main():
+            first = A.flaky
+            with self.assertRaises(ValueError):
+                await first
+            self.assertIsNot(A.flaky, first)
+            self.assertEqual(await A.flaky, 2)
+            self.assertEqual(await A.flaky, 2)
+
+        asyncio.run(main())
+
+    def test_async_constant_immutable(self):
+        class A(ClassOnly):
+            @async_constant
+            async def value(cls):
+                return 1
+
+        with self.assertRaises(TypeError):
+            A.value = 2
+
+
+class TestRefreshableConstant(unittest.TestCase):
+    def test_refresh(self):
+        version = 0
+
+        class A(ClassOnly):
+            @refreshable_constant(ttl=3600)
+            def config(cls):
+                nonlocal version
+                version += 1
+                return version
+
+        self.assertEqual(A.config, 1)
+        self.assertEqual(A.config, 1)
+        self.assertEqual(refresh(A, "config"), 2)
+        self.assertEqual(A.config, 2)
+
+        with self.assertRaises(TypeError):
+            A.config = 5
+
+    def test_stale_value_recomputed_in_background(self):
+        version = 0
+        started = threading.Event()
+        release = threading.Event()
+
+        class A(ClassOnly):
+            @refreshable_constant(ttl=0.01)
+            def config(cls):
+                nonlocal version
+                version += 1
+                if version > 1:
+                    started.set()
+                    release.wait(5)
+                return version
+
+        self.assertEqual(A.config, 1)
+        time.sleep(0.02)
+        # Stale reads return the old value without waiting for the new one
+        self.assertEqual(A.config, 1)
+        self.assertTrue(started.wait(5))
+        self.assertEqual(A.config, 1)
+        release.set()
+
+        deadline = time.monotonic() + 5
+        while A.config == 1 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertEqual(A.config, 2)
+        self.assertEqual(version, 2)
+
+    def test_failed_refresh_keeps_old_value(self):
+        attempts = 0
+
+        class A(ClassOnly):
+            @refreshable_constant(ttl=3600)
+            def config(cls):
+                nonlocal attempts
+                attempts += 1
+                if attempts > 1:
+                    raise ValueError
+                return attempts
+
+        self.assertEqual(A.config, 1)
+        with self.assertRaises(ValueError):
+            refresh(A, "config")
+        self.assertEqual(A.config, 1)
+
+    def test_refresh_requires_refreshable_constant(self):
+        class A(ClassOnly):
+            @constant
+            def config(cls):
+                return 1
+
+        with self.assertRaises(TypeError):
+            refresh(A, "config")
+
+
+class TestInstalledConstant(unittest.TestCase):
+    def test_installed(self):
+        calls = []
+
+        class A(ClassOnly):
+            @installed_constant
+            def name(cls):
+                calls.append(cls.__name__)
+                return cls.__name__
+
+        class B(A):
+            pass
+
+        descriptor = vars(A)["name"]
+        self.assertEqual(A.name, "A")
+        # The value is now a plain class attribute
+        self.assertEqual(vars(A)["name"], "A")
+        # Existing and new subclasses still compute their own values
+        self.assertIs(vars(B)["name"], descriptor)
+
+        class C(A):
+            pass
+
+        class D(B):
+            pass
+
+        self.assertEqual((B.name, C.name, D.name), ("B", "C", "D"))
+        self.assertEqual((A.name, B.name, C.name, D.name), ("A", "B", "C", "D"))
+        self.assertEqual(calls, ["A", "B", "C", "D"])
+
+        for cls in A, B, C, D:
+            with self.assertRaises(TypeError):
+                cls.name = "x"
+            self.assertNotIn("_initializing_", vars(cls))
+
+    def test_install_on_subclass_first(self):
+        class A(ClassOnly):
+            @installed_constant
+            def name(cls):
+                return cls.__name__
+
+        class B(A):
+            pass
+
+        class C(B):
+            pass
+
+        class Override(B):
+            name = "override"
+
+        self.assertEqual(B.name, "B")
+        self.assertEqual(C.name, "C")
+        self.assertEqual(A.name, "A")
+        self.assertEqual(Override.name, "override")
+
+    def test_installed_single_flight(self):
+        calls = 0
+        barrier = threading.Barrier(8)
+
+        class A(ClassOnly):
+            @installed_constant
+            def slow(cls):
+                nonlocal calls
+                calls += 1
+                time.sleep(0.05)
+                return object()
+
+        def read():
+            barrier.wait()
+            return A.slow
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: read(), range(8)))
+        self.assertEqual(calls, 1)
+        self.assertEqual(len({id(r) for r in results}), 1)
+        self.assertIs(vars(A)["slow"], results[0])
+
+    def test_installed_on_namespace(self):
+        class N(Namespace):
+            a = 1
+
+            @installed_constant
+            def b(cls):
+                return cls.a + 1
+
+        class N2(N):
+            a = 10
+
+        self.assertEqual(N.b, 2)
+        self.assertEqual(N2.b, 11)
+        self.assertEqual(N2.nameof.b, "b")
+        with self.assertRaises(TypeError):
+            N2.b = 3
+
+
+class TestEvictableConstant(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        calls = self.calls
+
+        class Cache(ClassOnly):
+            @evictable_constant(sizeof=lambda value: 100)
+            def table(cls):
+                calls.append(cls.__name__)
+                return [cls.__name__]
+
+        self.descriptor = vars(Cache)["table"]
+        self.classes = [type(Cache)(name, (Cache,), {}) for name in "ABC"]
+        self.before = budget.stats()
+
+    def tearDown(self):
+        budget.set_limit(None)
+        # Release the values from the budget, so that tests don't affect each other
+        del self.classes, self.descriptor
+        gc.collect()
+
+    def test_least_recently_used_evicted(self):
+        A, B, C = self.classes
+        budget.set_limit(self.before.used + 250)
+        A.table, B.table, A.table, C.table
+        self.assertEqual(self.calls, ["A", "B", "C"])
+        self.assertEqual(self.descriptor.evictions, 1)
+        self.assertFalse(self.descriptor._is_computed(B))
+
+        # B is computed again, evicting A, the least recently read
+        self.assertEqual(B.table, ["B"])
+        self.assertEqual(C.table, ["C"])
+        self.assertEqual(self.calls, ["A", "B", "C", "B"])
+        self.assertEqual(
+            (self.descriptor.evictions, self.descriptor.recomputes), (2, 1)
+        )
+        stats = budget.stats()
+        self.assertEqual(stats.used - self.before.used, 200)
+        self.assertEqual(stats.evictions - self.before.evictions, 2)
+        self.assertEqual(stats.recomputes - self.before.recomputes, 1)
+
+    def test_set_limit_evicts(self):
+        for c in self.classes:
+            c.table
+        budget.set_limit(self.before.used + 100)
+        self.assertEqual(self.descriptor.evictions, 2)
+        self.assertEqual(
+            [self.descriptor._is_computed(c) for c in self.classes],
+            [False, False, True],
+        )
+
+    def test_unlimited(self):
+        for c in self.classes:
+            c.table
+            c.table
+        self.assertEqual(self.calls, ["A", "B", "C"])
+        self.assertEqual(budget.stats().used - self.before.used, 300)
+
+    def test_recompute_is_single_flight(self):
+        A, B, C = self.classes
+        budget.set_limit(self.before.used + 100)
+        A.table, B.table
+        self.assertFalse(self.descriptor._is_computed(A))
+        with ThreadPoolExecutor(8) as pool:
+            values = list(pool.map(lambda _: A.table, range(8)))
+        self.assertTrue(all(v == ["A"] for v in values))
+        self.assertEqual(self.calls, ["A", "B", "A"])
+
+    def test_released_with_class(self):
+        A = self.classes.pop(0)
+        A.table
+        self.assertEqual(budget.stats().used - self.before.used, 100)
+        del A
+        gc.collect()
+        self.assertEqual(budget.stats().used, self.before.used)
+
+    def test_released_while_budget_locked(self):
+        A = self.classes.pop(0)
+        A.table
+        del A
+
+        def collect():
+            # Garbage collection can run while the budget's lock is held
+            with budget._budget.lock:
+                gc.collect()
+
+        thread = threading.Thread(target=collect, daemon=True)
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(budget.stats().used, self.before.used)
+
+
+class TestMemoized(unittest.TestCase):
+    def test_memoized(self):
+        calls = []
+
+        class Methodology(ClassOnly):
+            spread = 1
+
+            @memoized
+            def rate(cls, currency, days=1):
+                calls.append((cls.__name__, currency, days))
+                return cls.spread * days
+
+        class Wide(Methodology):
+            spread = 10
+
+        self.assertEqual(Methodology.rate("USD"), 1)
+        self.assertEqual(Methodology.rate("USD"), 1)
+        self.assertEqual(Methodology.rate("USD", days=3), 3)
+        self.assertEqual(Wide.rate("USD"), 10)
+        self.assertEqual(Wide.rate("USD"), 10)
+        self.assertEqual(
+            calls,
+            [("Methodology", "USD", 1), ("Methodology", "USD", 3), ("Wide", "USD", 1)],
+        )
+        self.assertEqual(Methodology.rate.cache_info(), (1, 2, 128, 2))
+        self.assertEqual(Wide.rate.cache_info(), (1, 1, 128, 1))
+
+        Methodology.rate.cache_clear()
+        self.assertEqual(Methodology.rate.cache_info(), (0, 0, 128, 0))
+        self.assertEqual(Wide.rate.cache_info().currsize, 1)
+
+        with self.assertRaises(TypeError):
+            Methodology.rate(["unhashable"])
+
+    def test_lru(self):
+        calls = []
+
+        class A(ClassOnly):
+            @memoized(maxsize=2)
+            def square(cls, x):
+                calls.append(x)
+                return x * x
+
+        for x in [1, 2, 1, 3, 1, 2]:
+            A.square(x)
+        # 2 was least recently used when 3 was added
+        self.assertEqual(calls, [1, 2, 3, 2])
+        self.assertEqual(A.square.cache_info(), (2, 4, 2, 2))
+
+    def test_override(self):
+        class Base(ClassOnly):
+            @memoized
+            def value(cls, x):
+                return cls.compute(x)
+
+            @classmethod
+            def compute(cls, x):
+                return x
+
+        class Child(Base):
+            @memoized
+            def value(cls, x):
+                return -super().value(x)
+
+        self.assertEqual(Base.value(2), 2)
+        self.assertEqual(Child.value(2), -2)
+        self.assertEqual(Child.value(2), -2)
+
+    def test_thread_safe(self):
+        class A(ClassOnly):
+            @memoized(maxsize=10)
+            def double(cls, x):
+                return 2 * x
+
+        def work(start):
+            return all(
+                A.double(x % 20) == 2 * (x % 20) for x in range(start, start + 1000)
+            )
+
+        with ThreadPoolExecutor(8) as pool:
+            self.assertTrue(all(pool.map(work, range(8))))
+        info = A.double.cache_info()
+        self.assertLessEqual(info.currsize, 10)
+        self.assertLessEqual(info.hits + info.misses, 8000)
+
+    def test_does_not_keep_classes_alive(self):
+        class A(ClassOnly):
+            @memoized
+            def method(cls, x):
+                return x
+
+        B = type(A)("B", (A,), {})
+        B.method(1)
+        bound = vars(A)["method"]._bound
+        self.assertEqual(len(bound), 1)
+        del B
+        gc.collect()
+        self.assertEqual(len(bound), 0)
+
+    def test_requires_class_only(self):
+        with self.assertRaises((TypeError, RuntimeError)):
+
+            class Class:
+                @memoized
+                def method(cls):
+                    pass
+
+
+class TestImport(unittest.TestCase):
+    def test_heavy_modules_imported_on_use(self):
+        code = (
+            "import sys, class_only_design; "
+            "print(sorted(m for m in ('asyncio', 'concurrent.futures', 'hashlib', 'inspect',"
+            " 'multiprocessing', 'pickle', 'tempfile') if m in sys.modules))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), "[]")
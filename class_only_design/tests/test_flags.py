@@ -0,0 +1,90 @@
+import unittest
+
+from class_only_design import Namespace
+from class_only_design import autoflag
+from class_only_design import autoname
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+class Permission(Namespace):
+    read = autoflag
+    write = autoflag
+    execute = autoflag
+
+
+class Extended(Permission):
+    read_write = Permission.read | Permission.write
+    admin = autoflag
+    label = autoname
+
+
+class TestAutoflag(unittest.TestCase):
+    def test_autoflag(self):
+        self.assertEqual(list(Permission), [1, 2, 4])
+        self.assertEqual((Extended.read_write, Extended.admin), (3, 8))
+        self.assertEqual(Extended.label, "label")
+
+    def test_continues_after_ints(self):
+        class Mixed(Namespace):
+            a = 1
+            b = 8
+            c = autoflag
+            enabled = True
+            d = autoflag
+
+        self.assertEqual((Mixed.c, Mixed.d), (16, 32))
+
+    def test_only_flags_reserve_bits(self):
+        class Settings(Namespace):
+            limit = 1000
+            read = autoflag
+            write = 4
+            negative = -1
+            execute = autoflag
+            read_write = read | write
+            admin = autoflag
+
+        self.assertEqual((Settings.read, Settings.execute, Settings.admin), (1, 8, 16))
+        self.assertEqual(Settings.decompose(Settings.read_write), ["read", "write"])
+
+    def test_from_mapping(self):
+        More = Extended.from_mapping("More", {"audit": autoflag, "debug": autoflag})
+        self.assertEqual((More.audit, More.debug), (16, 32))
+        self.assertEqual(More.decompose(More.audit | More.read), ["read", "audit"])
+
+
+class TestFlags(unittest.TestCase):
+    def test_combine(self):
+        self.assertEqual(Extended.combine(), 0)
+        self.assertEqual(Extended.combine("read", "admin"), 9)
+        self.assertEqual(Extended.combine(Extended.write, "execute"), 6)
+        with self.assertRaises(KeyError):
+            Extended.combine("missing")
+
+    def test_decompose(self):
+        self.assertEqual(Extended.decompose(0), [])
+        self.assertEqual(Extended.decompose(13), ["read", "execute", "admin"])
+        # Combinations aren't flags
+        self.assertEqual(Extended.decompose(Extended.read_write), ["read", "write"])
+        for mask in (16, 17, -1):
+            with self.assertRaises(ValueError, msg=mask):
+                Extended.decompose(mask)
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_decode_flags(self):
+        masks = np.array([[0, 1], [6, 15]], dtype=np.uint8)
+        decoded = Extended.decode_flags(masks)
+        self.assertEqual(list(decoded), ["read", "write", "execute", "admin"])
+        np.testing.assert_array_equal(decoded["read"], [[False, True], [False, True]])
+        np.testing.assert_array_equal(decoded["admin"], [[False, False], [False, True]])
+
+        self.assertEqual(list(Extended.decode_flags([3])["write"]), [True])
+        with self.assertRaises(ValueError) as e:
+            Extended.decode_flags([1, 16, 48, -2, 16])
+        self.assertEqual(e.exception.args[1], [-2, 16, 48])
+        with self.assertRaises(TypeError):
+            Extended.decode_flags([1.5])
@@ -0,0 +1,145 @@
+import asyncio
+import io
+import json
+import tempfile
+import threading
+import tracemalloc
+import unittest
+
+from class_only_design import ClassOnly
+from class_only_design import constant
+from class_only_design import instrument
+from class_only_design import api
+
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(instrument.reset)
+        self.addCleanup(instrument.disable)
+
+    def make_class(self):
+        class Config(ClassOnly):
+            @constant
+            def table(cls):
+                return list(range(1000))
+
+            @constant
+            def other(cls):
+                return "x"
+
+        return Config
+
+    def test_disabled_is_untouched(self):
+        original = vars(api.constant)["__get__"]
+        instrument.enable()
+        self.assertIsNot(vars(api.constant)["__get__"], original)
+        instrument.disable()
+        self.assertIs(vars(api.constant)["__get__"], original)
+        self.assertIsNone(api._observer)
+
+    def test_stats(self):
+        events = []
+        Config = self.make_class()
+        instrument.enable(sink=events.append)
+        for _ in range(3):
+            Config.table
+        Config.other
+
+        stats = {s.name: s for s in instrument.stats()}
+        table = stats["table"]
+        self.assertTrue(table.class_name.endswith("make_class.<locals>.Config"))
+        self.assertEqual((table.hits, table.misses), (2, 1))
+        self.assertEqual((stats["other"].hits, stats["other"].misses), (0, 1))
+        self.assertEqual(table.thread, threading.current_thread().name)
+        self.assertGreater(table.size, 8000)
+        self.assertGreater(table.wall_time, 0)
+
+        self.assertEqual([e.name for e in events], ["table", "other"])
+
+        fp = io.StringIO()
+        records = instrument.export(fp)
+        self.assertEqual(json.loads(fp.getvalue()), records)
+        self.assertIn("Config.table", instrument.report())
+
+        # Nothing is recorded once disabled
+        instrument.disable()
+        Config.table
+        self.assertEqual({s.name: s for s in instrument.stats()}["table"].hits, 2)
+
+    def test_trace_memory(self):
+        self.addCleanup(tracemalloc.stop)
+        Config = self.make_class()
+        instrument.enable(trace_memory=True)
+        Config.table
+        (table,) = [s for s in instrument.stats() if s.name == "table"]
+        self.assertGreater(table.size, 8000)
+        instrument.disable()
+        self.assertFalse(tracemalloc.is_tracing())
+
+        # Tracing started elsewhere is left running
+        tracemalloc.start()
+        instrument.enable(trace_memory=True)
+        instrument.disable()
+        self.assertTrue(tracemalloc.is_tracing())
+
+    def test_nested_computations(self):
+        class A(ClassOnly):
+            @constant
+            def base(cls):
+                return 1
+
+            @constant
+            def derived(cls):
+                return cls.base + cls.base
+
+        instrument.enable()
+        A.derived
+        A.derived
+        stats = {s.name: (s.hits, s.misses) for s in instrument.stats()}
+        self.assertEqual(stats, {"base": (1, 1), "derived": (1, 1)})
+
+    def test_subclasses_are_counted(self):
+        class A(ClassOnly):
+            @api.refreshable_constant(ttl=60)
+            def value(cls):
+                return 1
+
+        instrument.enable()
+        A.value
+        A.value
+        (stats,) = instrument.stats()
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+
+    def test_loads_are_misses(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        calls = []
+
+        class A(ClassOnly):
+            @api.persistent_constant(cache_dir=directory.name)
+            def value(cls):
+                calls.append(1)
+                return list(range(100))
+
+        instrument.enable()
+        A.value
+        # As in a new process, which loads the value from disk
+        vars(A)["value"]._values.clear()
+        A.value
+        A.value
+        (stats,) = instrument.stats()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((stats.hits, stats.misses), (1, 2))
+
+    def test_async_constants_not_counted(self):
+        class A(ClassOnly):
+            @api.async_constant
+            async def value(cls):
+                return 1
+
+        async def read():
+            return await A.value + await A.value
+
+        instrument.enable()
+        self.assertEqual(asyncio.run(read()), 2)
+        self.assertEqual(instrument.stats(), [])
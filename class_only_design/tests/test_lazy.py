@@ -0,0 +1,205 @@
+import os
+import pickle
+import subprocess
+import sys
+import textwrap
+import types
+import unittest
+
+from class_only_design import ClassOnly
+from class_only_design import Namespace
+from class_only_design import lazy
+
+MODULE = """
+from class_only_design import Namespace
+from class_only_design import lazy
+
+created = []
+
+
+def _units():
+    created.append("Units")
+
+    class Units(Namespace):
+        metre = "m"
+        second = "s"
+
+    return Units
+
+
+def _other():
+    created.append("Other")
+
+    class Other(Namespace):
+        a = 1
+
+    return Other
+
+
+__getattr__ = lazy.module_getattr(__name__, Units=_units, Other=_other)
+
+
+@lazy.lazy_class
+def Sizes():
+    created.append("Sizes")
+
+    class Sizes(Namespace):
+        small = 1
+        large = 2
+
+    return Sizes
+"""
+
+
+def import_module(name):
+    module = types.ModuleType(name)
+    sys.modules[name] = module
+    exec(MODULE, vars(module))
+    return module
+
+
+class TestLazyClass(unittest.TestCase):
+    def test_created_on_first_use(self):
+        calls = []
+
+        @lazy.lazy_class
+        def Colors():
+            calls.append(1)
+
+            class Colors(Namespace):
+                red = "r"
+                green = "g"
+
+            return Colors
+
+        self.assertIsInstance(Colors, lazy.LazyClass)
+        self.assertTrue(Colors)
+        self.assertEqual(calls, [])
+        self.assertIn("lazy class", repr(Colors))
+
+        self.assertEqual(Colors.red, "r")
+        self.assertEqual(calls, [1])
+        self.assertEqual(list(Colors), ["r", "g"])
+        self.assertEqual(len(Colors), 2)
+        self.assertIn("g", Colors)
+        self.assertEqual(Colors.nameof.green, "green")
+        self.assertEqual(Colors["red"], "r")
+        self.assertEqual(calls, [1])
+        self.assertTrue(
+            Colors.__qualname__.endswith("test_created_on_first_use.<locals>.Colors")
+        )
+
+    def test_behaves_like_class(self):
+        @lazy.lazy_class
+        def Base():
+            class Base(ClassOnly):
+                value = 1
+
+            return Base
+
+        class Child(Base):
+            other = 2
+
+        self.assertEqual((Child.value, Child.other), (1, 2))
+        self.assertTrue(issubclass(Child, Base))
+        self.assertIn(Base._resolve_(), Child.__mro__)
+        self.assertEqual(Base, Base._resolve_())
+        self.assertEqual(hash(Base), hash(Base._resolve_()))
+
+        with self.assertRaises(TypeError):
+            Base.value = 2
+        with self.assertRaises(TypeError):
+            Base.new = 2
+        with self.assertRaises(TypeError):
+            Base()
+
+    def test_module_and_doc_forwarded(self):
+        @lazy.lazy_class
+        def Sizes():
+            class Sizes(Namespace):
+                """Some sizes."""
+
+                small = 1
+
+            return Sizes
+
+        self.assertEqual(Sizes.__module__, __name__)
+        self.assertEqual(Sizes.__doc__, "Some sizes.")
+        # LazyClass itself keeps its own
+        self.assertEqual(lazy.LazyClass.__module__, "class_only_design.lazy")
+        self.assertIn("stand in", lazy.LazyClass.__doc__)
+        self.assertIs(pickle.loads(pickle.dumps(lazy.LazyClass)), lazy.LazyClass)
+
+    def test_failure_is_retried(self):
+        calls = []
+
+        @lazy.lazy_class
+        def Flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+
+            class Flaky(Namespace):
+                a = 1
+
+            return Flaky
+
+        with self.assertRaises(RuntimeError):
+            Flaky.a
+        self.assertEqual(Flaky.a, 1)
+
+
+class TestModuleGetattr(unittest.TestCase):
+    def tearDown(self):
+        sys.modules.pop("lazy_test_module", None)
+
+    def test_module_getattr(self):
+        module = import_module("lazy_test_module")
+        self.assertEqual(module.created, [])
+
+        from lazy_test_module import Units
+
+        self.assertEqual(module.created, ["Units"])
+        self.assertIs(vars(module)["Units"], Units)
+        self.assertEqual(Units.metre, "m")
+        self.assertEqual(Units.__qualname__, "Units")
+        self.assertIs(pickle.loads(pickle.dumps(Units)), Units)
+        with self.assertRaises(AttributeError):
+            module.Missing
+        self.assertEqual(module.created, ["Units"])
+
+    def test_eager_environment_variable(self):
+        code = textwrap.dedent(
+            """
+            from class_only_design.tests import test_lazy
+            module = test_lazy.import_module("lazy_test_module")
+            print(sorted(module.created))
+            """
+        )
+        environment = dict(os.environ, CLASS_ONLY_DESIGN_EAGER="1")
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=environment,
+        ).stdout
+        self.assertEqual(output.strip(), "['Other', 'Sizes', 'Units']")
+
+    def test_force_eager(self):
+        code = textwrap.dedent(
+            """
+            from class_only_design import lazy
+            from class_only_design.tests import test_lazy
+            module = test_lazy.import_module("lazy_test_module")
+            print(module.created)
+            lazy.force_eager()
+            print(sorted(module.created), type(module.Sizes).__name__)
+            """
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(
+            output.split("\n")[:2], ["[]", "['Other', 'Sizes', 'Units'] LazyClass"]
+        )
@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from class_only_design import Namespace
+from class_only_design import loader
+from class_only_design import util
+
+CONFIG = {
+    "name": "reference",
+    "pricing": {
+        "currency": "USD",
+        "curves": {"default": "ois", "fallback": "libor"},
+    },
+    "limits": {"max_notional": 10**9, "tenors": [1, 3, 6]},
+}
+
+
+def build_eagerly(name, mapping, qualname=None):
+    qualname = qualname or name
+    members = {
+        k: build_eagerly(k, v, f"{qualname}.{k}") if isinstance(v, dict) else v
+        for k, v in mapping.items()
+    }
+    cls = Namespace.from_mapping(name, members)
+    type.__setattr__(cls, "__qualname__", qualname)
+    return cls
+
+
+def public(names):
+    return [k for k in names if not util._is_internal(k)]
+
+
+class TestLoader(unittest.TestCase):
+    def assertSameNamespace(self, lazy, eager):
+        self.assertEqual(lazy.__qualname__, eager.__qualname__)
+        self.assertEqual(list(lazy.keys()), list(eager.keys()))
+        self.assertEqual(public(dir(lazy.nameof)), public(dir(eager.nameof)))
+        for name, value in eager.items():
+            self.assertEqual(getattr(lazy.nameof, name), name)
+            if isinstance(value, type(Namespace)):
+                self.assertSameNamespace(getattr(lazy, name), value)
+            else:
+                self.assertEqual(getattr(lazy, name), value)
+                self.assertEqual(lazy.name_for(value), name)
+
+    def test_sections_are_created_on_access(self):
+        Config = loader.load("Config", CONFIG)
+        self.assertIsInstance(vars(Config)["pricing"], loader._LazySection)
+
+        curves = Config.pricing.curves
+        self.assertEqual(curves.default, "ois")
+        self.assertEqual(curves.__qualname__, "Config.pricing.curves")
+        self.assertEqual(curves.__module__, __name__)
+        self.assertIs(vars(Config)["pricing"], Config.pricing)
+        self.assertIs(Config.pricing.curves, curves)
+        # Siblings are untouched
+        self.assertIsInstance(vars(Config)["limits"], loader._LazySection)
+
+    def test_matches_eager_build(self):
+        Lazy = loader.load("Config", CONFIG)
+        Eager = build_eagerly("Config", CONFIG)
+        self.assertEqual(len(Lazy), len(Eager))
+        self.assertSameNamespace(Lazy, Eager)
+
+        # Iteration creates the sections it yields
+        Lazy = loader.load("Config", CONFIG)
+        values = list(Lazy)
+        self.assertEqual(values[0], "reference")
+        self.assertIs(values[1], Lazy.pricing)
+        self.assertEqual(Lazy.name_for(Lazy.limits), "limits")
+        self.assertEqual(dict(Lazy.as_mapping())["limits"].tenors, [1, 3, 6])
+
+    def test_immutable(self):
+        Config = loader.load("Config", CONFIG)
+        with self.assertRaises(TypeError):
+            Config.name = "other"
+        with self.assertRaises(TypeError):
+            Config.pricing = None
+        with self.assertRaises(TypeError):
+            Config.pricing.currency = "EUR"
+        with self.assertRaises(TypeError):
+            Config()
+        with self.assertRaises(TypeError):
+            Config.pricing()
+        self.assertEqual(Config.pricing.currency, "USD")
+
+    def test_subclass(self):
+        Config = loader.load("Config", CONFIG)
+
+        class Local(Config):
+            name = "local"
+
+        self.assertEqual(list(Local.keys()), ["name", "pricing", "limits"])
+        self.assertEqual(Local.name, "local")
+        self.assertIs(Local.pricing, Config.pricing)
+
+    def test_load_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "config.json")
+            with open(path, "w") as f:
+                json.dump(CONFIG, f)
+            Config = loader.load("Config", path)
+        self.assertEqual(Config.limits.max_notional, 10**9)
+        self.assertSameNamespace(Config, build_eagerly("Config", CONFIG))
+
+    def test_invalid_names(self):
+        with self.assertRaises(ValueError):
+            loader.load("Config", {"nameof": 1})
+        Config = loader.load("Config", {"section": {"__init__": 1}})
+        with self.assertRaises(ValueError):
+            Config.section
+
+    def test_concurrent_access(self):
+        config = {f"section{i}": {"value": i} for i in range(50)}
+        Config = loader.load("Config", config)
+        results = []
+
+        def access():
+            results.append([getattr(Config, k) for k in config])
+
+        threads = [threading.Thread(target=access) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for sections in results:
+            self.assertEqual(sections, list(Config))
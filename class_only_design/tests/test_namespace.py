@@ -87,6 +87,35 @@ class TestNamespace(unittest.TestCase):
         # Namespace classes can tell you their attr names as strings
         self.assertEqual(Valid.nameof.a_long_name, "a_long_name")
 
+    def test_nameof_table(self):
+        class Regular:
+            mixed_in = 1
+
+        class Base(Namespace):
+            a = 1
+            b = 2
+
+        class Child(Regular, Base):
+            c = 3
+
+        # Members, including inherited ones, are plain attributes of nameof
+        self.assertEqual(vars(Child.nameof), {"c": "c", "a": "a", "b": "b"})
+        self.assertEqual(sorted(dir(Child.nameof)), ["a", "b", "c"])
+        self.assertEqual(Child.nameof.a, "a")
+        # Other attributes of the class are still found
+        self.assertEqual(Child.nameof.mixed_in, "mixed_in")
+        with self.assertRaises(AttributeError):
+            Child.nameof.missing
+        with self.assertRaises(AttributeError):
+            Child.nameof.__missing__
+
+        # Several names at once
+        self.assertEqual(Child.nameof(["a", "c", "mixed_in"]), ["a", "c", "mixed_in"])
+        self.assertEqual(Child.nameof(iter(["b"])), ["b"])
+        with self.assertRaises(AttributeError) as e:
+            Child.nameof(["a", "x", 5, "y"])
+        self.assertEqual(e.exception.args[1], ["x", 5, "y"])
+
     def test_namespace_iteration(self):
         class Regular:
             a = 1
@@ -107,6 +136,204 @@ class TestNamespace(unittest.TestCase):
         # Iteration is in reverse definition order, including overridden definitions
         self.assertSequenceEqual(iterable_compare(N2), iterable_compare([4, 5, 5, 3]))
 
+    def test_len_items_keys(self):
+        class N(Namespace):
+            a = 1
+            b = 2
+
+        class N2(N):
+            c = 3
+            a = 4
+
+        self.assertEqual(len(N), 2)
+        self.assertEqual(len(N2), 3)
+        self.assertSequenceEqual(list(N2.keys()), ["c", "a", "b"])
+        self.assertSequenceEqual(list(N2.items()), [("c", 3), ("a", 4), ("b", 2)])
+        self.assertSequenceEqual(list(N2), [3, 4, 2])
+        self.assertEqual(len(Namespace), 0)
+        self.assertTrue(Namespace)
+        self.assertTrue(N.from_mapping("Empty", {}))
+
+    def test_mapping_protocol(self):
+        class Pairs(Namespace):
+            usd = ("USD", 840)
+            eur = ("EUR", 978)
+
+        self.assertEqual(Pairs["usd"], ("USD", 840))
+        with self.assertRaises(KeyError):
+            Pairs["missing"]
+        self.assertEqual(dict(Pairs), Pairs.as_mapping())
+        self.assertEqual(dict(Pairs), {"usd": ("USD", 840), "eur": ("EUR", 978)})
+
+    def test_name_for(self):
+        class N(Namespace):
+            a = 1
+            b = "b"
+            c = [1, 2]
+            d = 1
+
+        class N2(N):
+            e = 1
+            b = 2
+
+        self.assertEqual(N.name_for(1), "a")
+        self.assertEqual(N.name_for("b"), "b")
+        self.assertEqual(N.name_for([1, 2]), "c")
+        # Overrides and duplicates resolve to the first member in iteration order
+        self.assertEqual(N2.name_for(1), "e")
+        self.assertEqual(N2.name_for(2), "b")
+        self.assertEqual(N2.name_for("b", None), None)
+
+        with self.assertRaises(ValueError):
+            N2.name_for("b")
+        with self.assertRaises(ValueError):
+            N.name_for({})
+
+    def test_as_mapping(self):
+        class N(Namespace):
+            a = 1
+            b = 2
+
+        class N2(N):
+            _c_ = 3
+            b = 4
+
+        mapping = N2.as_mapping()
+        self.assertIs(N2.as_mapping(), mapping)
+        self.assertEqual(dict(mapping), {"b": 4, "a": 1})
+        self.assertNotIn("nameof", mapping)
+        with self.assertRaises(TypeError):
+            mapping["a"] = 5
+
+    def test_multiple_namespace_bases(self):
+        class A(Namespace):
+            a = 1
+            x = "a"
+
+        class B(Namespace):
+            b = 2
+            x = "b"
+
+        class C(A, B):
+            c = 3
+
+        class D(C):
+            d = 4
+
+        self.assertEqual(list(C.items()), [("c", 3), ("a", 1), ("x", "a"), ("b", 2)])
+        self.assertEqual(list(D.keys()), ["d", "c", "a", "x", "b"])
+
+    def test_from_mapping(self):
+        currencies = {f"C{i}": i for i in range(1000)}
+        currencies["USD"] = autoname
+        N = Namespace.from_mapping("Currencies", currencies)
+
+        self.assertEqual(N.__name__, "Currencies")
+        self.assertEqual(N.__module__, __name__)
+        self.assertEqual(len(N), 1001)
+        self.assertEqual(N.C5, 5)
+        self.assertEqual(N.USD, "USD")
+        self.assertEqual(N.nameof.C999, "C999")
+        with self.assertRaises(TypeError):
+            N.C1 = 2
+        with self.assertRaises(TypeError):
+            N()
+
+        Child = N.from_mapping("Child", {"C1": -1, "EUR": "EUR"})
+        self.assertTrue(issubclass(Child, N))
+        self.assertEqual(Child.C1, -1)
+        self.assertEqual(len(Child), 1002)
+
+        Other = Namespace.from_records(
+            "Other", ((k, v) for k, v in [("a", 1), ("b", 2)]), bases=[Child]
+        )
+        self.assertEqual(list(Other.keys())[:3], ["a", "b", "C1"])
+
+        Shadowing = Namespace.from_mapping("Shadowing", {"from_mapping": 1})
+        Records = Shadowing.from_records("Records", [("a", 1)])
+        self.assertEqual((Records.a, Records.from_mapping), (1, 1))
+
+    def test_contains(self):
+        class Base(Namespace):
+            a = 1
+            b = [2]
+
+        class Child(Base):
+            c = "c"
+
+        for value in (1, True, 1.0, [2], "c"):
+            self.assertIn(value, Child)
+        for value in (2, [3], "a", None, {}):
+            self.assertNotIn(value, Child)
+        self.assertNotIn("c", Base)
+
+    def test_validate(self):
+        class Base(Namespace):
+            a = 1
+            b = 2
+
+        class Child(Base):
+            c = "c"
+
+        Child.validate([1, 2, "c", 2])
+        Child.validate(iter([1]))
+        Child.validate([])
+        with self.assertRaises(ValueError) as e:
+            Child.validate([1, 3, "c", "d", 3])
+        self.assertEqual(e.exception.args[1], [(1, 3), (3, "d"), (4, 3)])
+        with self.assertRaises(ValueError) as e:
+            Child.validate([[1], 2, {}])
+        self.assertEqual(e.exception.args[1], [(0, [1]), (2, {})])
+
+        class Unhashable(Namespace):
+            a = [1]
+            b = 2
+
+        Unhashable.validate([[1], 2])
+        with self.assertRaises(ValueError) as e:
+            Unhashable.validate([2, [2], 3])
+        self.assertEqual(e.exception.args[1], [(1, [2]), (2, 3)])
+
+    def test_as_frozen(self):
+        class Base(Namespace):
+            a = 1
+            b = [2]
+
+        class Child(Base):
+            c = 3
+            a = 4
+
+        frozen = Child.as_frozen()
+        self.assertIs(Child.as_frozen(), frozen)
+        self.assertEqual((frozen.a, frozen.b, frozen.c), (4, [2], 3))
+        self.assertIs(frozen.b, Base.b)
+        self.assertEqual(list(frozen), list(Child))
+        self.assertEqual(len(frozen), len(Child))
+        self.assertEqual(Base.as_frozen().a, 1)
+
+        with self.assertRaises(TypeError):
+            frozen.a = 5
+        with self.assertRaises(TypeError):
+            frozen.x = 5
+        with self.assertRaises(TypeError):
+            del frozen.a
+        with self.assertRaises(TypeError):
+            type(frozen)()
+        with self.assertRaises(AttributeError):
+            frozen.missing
+
+        with self.assertRaises(ValueError):
+            Namespace.from_mapping("Bad", {"not an identifier": 1}).as_frozen()
+
+        # Members can shadow the methods used to build the frozen class
+        Shadowing = Namespace.from_mapping("Shadowing", {"as_mapping": 1, "items": 2})
+        self.assertEqual(Shadowing.as_frozen().as_mapping, 1)
+
+    def test_from_mapping_invalid_names(self):
+        for name in ["__init__", "_sunder_", "nameof", 5, ("a", "_")]:
+            with self.assertRaises(ValueError, msg=name):
+                Namespace.from_mapping("Bad", {name: 1})
+
     def test_reserved_names(self):
         # no namespace class may use any name in constants.reserved names
         for name in constants.RESERVED_NAMES:
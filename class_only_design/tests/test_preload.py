@@ -0,0 +1,258 @@
+import multiprocessing
+import pickle
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+from class_only_design import ClassOnly
+from class_only_design import constant
+from class_only_design import installed_constant
+from class_only_design import warm
+from class_only_design import preload
+
+
+# Process pools need to import these, so they live at module level
+class Base(ClassOnly):
+    @constant
+    def name(cls):
+        return cls.__name__
+
+    @constant
+    def greeting(cls):
+        return "hello " + cls.name
+
+
+class Child(Base):
+    pass
+
+
+# The number of times each Snapshotted constant was computed in this process
+computed = []
+
+
+class Snapshotted(ClassOnly):
+    @constant
+    def table(cls):
+        computed.append("table")
+        return pickle.PickleBuffer(bytearray(b"abc" * 1000))
+
+    @installed_constant
+    def size(cls):
+        computed.append("size")
+        return memoryview(cls.table).nbytes
+
+
+class SnapshottedChild(Snapshotted):
+    pass
+
+
+class Installed(ClassOnly):
+    @installed_constant
+    def name(cls):
+        return cls.__name__
+
+
+class InstalledChild(Installed):
+    pass
+
+
+class Restored(ClassOnly):
+    @constant
+    def x(cls):
+        return 1
+
+
+def read_snapshotted(_):
+    table = memoryview(SnapshottedChild.table)
+    # Restored installed constants are installed without being read
+    size = vars(Snapshotted)["size"]
+    return bytes(table[:3]), table.readonly, size, list(computed)
+
+
+class TestWarm(unittest.TestCase):
+    def test_warm_hierarchy(self):
+        calls = []
+
+        class A(ClassOnly):
+            @constant
+            def x(cls):
+                calls.append((cls.__name__, "x"))
+                return 1
+
+        class B(A):
+            @constant
+            def y(cls):
+                calls.append((cls.__name__, "y"))
+                return cls.x + 1
+
+        class C(A):
+            pass
+
+        found = {(c, name) for c, name, _ in preload.find_constants(A)}
+        self.assertEqual(found, {(A, "x"), (B, "x"), (B, "y"), (C, "x")})
+
+        done = warm(A)
+        self.assertEqual(set(done), found)
+        self.assertEqual(len(calls), 4)
+
+        # Everything is computed, so nothing runs again
+        self.assertEqual(warm(A), [])
+        self.assertEqual((A.x, B.x, B.y, C.x), (1, 1, 2, 1))
+        self.assertEqual(len(calls), 4)
+
+    def test_independent_constants_run_in_parallel(self):
+        # Each constant waits for the other to start, so they fail unless they overlap
+        barrier = threading.Barrier(2, timeout=5)
+
+        class A(ClassOnly):
+            @constant
+            def one(cls):
+                barrier.wait()
+                return 1
+
+            @constant
+            def two(cls):
+                barrier.wait()
+                return 2
+
+        with ThreadPoolExecutor(2) as pool:
+            warm(A, executor=pool)
+        self.assertEqual((A.one, A.two), (1, 2))
+
+    def test_dependencies_are_recorded(self):
+        class A(ClassOnly):
+            @constant
+            def base(cls):
+                return 1
+
+            @constant
+            def derived(cls):
+                return cls.base + 1
+
+        self.assertEqual(A.derived, 2)
+        self.assertEqual(vars(A)["derived"].dependencies(A), {(A, "base")})
+        self.assertEqual(vars(A)["base"].dependencies(A), set())
+
+    def test_dependent_constants_wait(self):
+        order = []
+        lock = threading.Lock()
+
+        class A(ClassOnly):
+            @constant
+            def base(cls):
+                time.sleep(0.05)
+                with lock:
+                    order.append("base")
+                return 1
+
+            @constant
+            def derived(cls):
+                with lock:
+                    order.append("derived")
+                return 2
+
+        class B(A):
+            pass
+
+        # Teach A which constants depend on which
+        vars(A)["derived"]._record_dependencies(B, {(B, "base")})
+        warm(B)
+        self.assertEqual(order, ["base", "derived"])
+
+    def test_dependencies_learned_from_first_class(self):
+        class A(ClassOnly):
+            @constant
+            def base(cls):
+                if cls is A:
+                    # So that derived reads base on A before it's computed
+                    first_started.wait(5)
+                return 1
+
+            @constant
+            def derived(cls):
+                # Whether base was already computed when derived started
+                started.append((cls, A.__dict__["base"]._is_computed(cls)))
+                first_started.set()
+                return cls.base + 1
+
+        first_started = threading.Event()
+        started = []
+        subclasses = [type(A)(f"A{i}", (A,), {}) for i in range(8)]
+        with ThreadPoolExecutor(4) as pool:
+            warm(A, executor=pool)
+        self.assertEqual(started[0], (A, False))
+        self.assertEqual(dict(started[1:]), dict.fromkeys(subclasses, True))
+
+    def test_warm_installed_constants(self):
+        class A(ClassOnly):
+            @installed_constant
+            def x(cls):
+                return cls.__name__
+
+        class B(A):
+            pass
+
+        self.assertEqual(set(warm(A)), {(A, "x"), (B, "x")})
+        self.assertEqual((A.x, B.x), ("A", "B"))
+        self.assertEqual(vars(A)["x"], "A")
+        # Installed values are found as computed
+        self.assertEqual(warm(A), [])
+
+    def test_warm_installed_constants_process_pool(self):
+        with ProcessPoolExecutor(2) as pool:
+            done = warm(Installed, executor=pool)
+        self.assertEqual(set(done), {(Installed, "name"), (InstalledChild, "name")})
+        # Values computed in the workers are installed in this process
+        self.assertEqual(
+            (vars(Installed)["name"], vars(InstalledChild)["name"]),
+            ("Installed", "InstalledChild"),
+        )
+
+    def test_warm_process_pool(self):
+        with ProcessPoolExecutor(2) as pool:
+            done = warm(Base, executor=pool)
+
+        self.assertEqual(len(done), 4)
+        self.assertTrue(vars(Base)["greeting"]._is_computed(Child))
+        self.assertEqual(Child.greeting, "hello Child")
+        self.assertEqual(Base.greeting, "hello Base")
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_snapshot_process_pool(self):
+        Snapshotted.size
+        SnapshottedChild.table
+        data = preload.snapshot(Snapshotted)
+        self.assertIsInstance(data, bytes)
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            2, mp_context=context, initializer=preload.restore, initargs=(data,)
+        ) as pool:
+            results = list(pool.map(read_snapshotted, range(4)))
+        for result in results:
+            self.assertEqual(result, (b"abc", True, 3000, []))
+
+    def test_restore(self):
+        A = Restored
+        A.x
+        data = preload.snapshot(A)
+        vars(A)["x"]._values.clear()
+        self.assertEqual(preload.restore(data), [(A, "x")])
+        self.assertTrue(vars(A)["x"]._is_computed(A))
+        self.assertEqual(A.x, 1)
+
+        # Values already computed are kept
+        vars(A)["x"]._values[A] = 2
+        preload.restore(data)
+        self.assertEqual(A.x, 2)
+
+    def test_invalid_snapshot(self):
+        with self.assertRaises(ValueError):
+            preload.restore(b"not a snapshot")
+        data = bytearray(preload.snapshot(Base))
+        data[len(preload._SNAPSHOT_MAGIC)] += 1
+        with self.assertRaises(ValueError):
+            preload.restore(data)
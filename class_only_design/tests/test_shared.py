@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import pickle
+import tempfile
+import unittest
+
+from class_only_design import ClassOnly
+from class_only_design import shared_memory_constant
+from class_only_design import storage
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+SIZE = 1_000_000
+
+
+# Worker processes started with spawn need to import this, so it lives at module level
+class Shared(ClassOnly):
+    @shared_memory_constant
+    def data(cls):
+        with open(os.path.join(os.environ["SHARED_TEST_DIR"], "calls"), "a") as f:
+            f.write(f"{os.getpid()}\n")
+        return pickle.PickleBuffer(bytearray(b"x" * SIZE))
+
+    @shared_memory_constant
+    def array(cls):
+        return np.arange(SIZE)
+
+
+def read_data(_):
+    view = Shared.data
+    return os.getpid(), bytes(view[:3]), len(view), view.readonly
+
+
+def sum_array(_):
+    array = Shared.array
+    return int(array.sum()), array.flags.writeable
+
+
+class TestSharedMemoryConstant(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        os.environ["SHARED_TEST_DIR"] = self.directory
+        self.addCleanup(os.environ.pop, "SHARED_TEST_DIR")
+
+    def run_pool(self, method, function):
+        context = multiprocessing.get_context(method)
+        pool = context.Pool(3)
+        try:
+            results = pool.map(function, range(12))
+        finally:
+            # close/join, unlike terminate, lets workers run their exit finalizers
+            pool.close()
+            pool.join()
+        return results
+
+    def check_pool(self, method):
+        descriptor = vars(Shared)["data"]
+        path = descriptor._path(Shared)
+        results = self.run_pool(method, read_data)
+
+        for _, prefix, length, readonly in results:
+            self.assertEqual((prefix, length, readonly), (b"xxx", SIZE, True))
+        with open(os.path.join(self.directory, "calls")) as f:
+            calls = f.read().split()
+        self.assertEqual(len(calls), 1)
+        # The publishing worker removed the file when it exited
+        self.assertFalse(os.path.exists(path))
+
+    @unittest.skipUnless(
+        "fork" in multiprocessing.get_all_start_methods(), "requires fork"
+    )
+    def test_fork(self):
+        self.check_pool("fork")
+
+    def test_spawn(self):
+        self.check_pool("spawn")
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_numpy(self):
+        results = self.run_pool("spawn", sum_array)
+        self.assertEqual(results, [(SIZE * (SIZE - 1) // 2, False)] * 12)
+
+    def test_changed_code_is_not_shared(self):
+        class A(ClassOnly):
+            pass
+
+        one = shared_memory_constant(lambda cls: 1)
+        two = shared_memory_constant(lambda cls: 2)
+        one.name = two.name = "value"
+        self.assertNotEqual(one._path(A), two._path(A))
+
+    def test_removed_before_read_is_recomputed(self):
+        calls = []
+
+        class A(ClassOnly):
+            @shared_memory_constant
+            def value(cls):
+                calls.append(1)
+                return len(calls)
+
+        path = vars(A)["value"]._path(A)
+        read = storage.read
+        reads = []
+
+        def remove_after_publishing(p):
+            reads.append(p)
+            if len(reads) == 2:
+                # As if the publishing process exited between publishing and this read
+                os.unlink(p)
+            return read(p)
+
+        storage.read = remove_after_publishing
+        self.addCleanup(setattr, storage, "read", read)
+        self.assertEqual(A.value, 2)
+        self.assertEqual((len(calls), len(reads)), (2, 3))
+        self.assertTrue(os.path.exists(path))
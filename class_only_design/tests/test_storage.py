@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from class_only_design import ClassOnly
+from class_only_design import persistent_constant
+from class_only_design import storage
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "value.pkl")
+
+    def test_round_trip(self):
+        value = {"a": [1, 2, 3], "b": b"bytes"}
+        storage.write(self.path, value)
+        self.assertEqual(storage.read(self.path), value)
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_arrays_are_memory_mapped(self):
+        value = {"x": np.arange(1000), "y": np.ones((3, 4)), "z": np.empty(0)}
+        storage.write(self.path, value)
+        loaded = storage.read(self.path)
+        for key, array in value.items():
+            np.testing.assert_array_equal(loaded[key], array)
+            self.assertFalse(loaded[key].flags.writeable)
+
+
+class TestPersistentConstant(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_dir = directory.name
+
+    def make(self, calls, source="v1"):
+        # Each call creates a new class with the same qualified name, like a fresh process would
+        class Lookup(ClassOnly):
+            version = source
+
+            @persistent_constant(inputs=["version"], cache_dir=self.cache_dir)
+            def table(cls):
+                calls.append(cls.version)
+                return {"version": cls.version}
+
+        return Lookup
+
+    def test_loaded_from_disk(self):
+        calls = []
+        self.assertEqual(self.make(calls).table, {"version": "v1"})
+        self.assertEqual(self.make(calls).table, {"version": "v1"})
+        self.assertEqual(calls, ["v1"])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_changed_inputs_replace_stale_entry(self):
+        calls = []
+        self.make(calls, "v1").table
+        self.assertEqual(self.make(calls, "v2").table, {"version": "v2"})
+        self.assertEqual(calls, ["v1", "v2"])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_changed_code_is_stale(self):
+        calls = []
+
+        def make(offset):
+            class Lookup(ClassOnly):
+                @persistent_constant(cache_dir=self.cache_dir)
+                def table(cls):
+                    calls.append(offset)
+                    return offset
+
+            return Lookup
+
+        make(1).table
+        make(1).table
+        self.assertEqual(calls, [1])
+
+        def make(offset):
+            class Lookup(ClassOnly):
+                @persistent_constant(cache_dir=self.cache_dir)
+                def table(cls):
+                    calls.append(offset)
+                    return offset + 1
+
+            return Lookup
+
+        self.assertEqual(make(1).table, 2)
+        self.assertEqual(calls, [1, 1])
+
+    def test_corrupt_entry_is_recomputed(self):
+        calls = []
+        self.make(calls).table
+        (name,) = os.listdir(self.cache_dir)
+        with open(os.path.join(self.cache_dir, name), "wb") as f:
+            f.write(b"garbage")
+        self.assertEqual(self.make(calls).table, {"version": "v1"})
+        self.assertEqual(calls, ["v1", "v1"])
@@ -32,3 +32,9 @@ class TestUtil(unittest.TestCase):
         gc.collect()
         with self.assertRaises(ReferenceError):
             n.a
+
+    def test_internal_names(self):
+        names = ["a", "__dunder__", "_sunder_", "nameof", "b_", "__x", "_", "___"]
+        expected = {n for n in names if util._is_internal(n)}
+        self.assertEqual(util._internal_names(names), expected)
+        self.assertEqual(util._internal_names([]), set())
@@ -0,0 +1,150 @@
+import subprocess
+import sys
+import unittest
+
+from class_only_design import Namespace
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+class TestImport(unittest.TestCase):
+    def test_numpy_imported_lazily(self):
+        code = "import sys, class_only_design; print('numpy' in sys.modules)"
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), "False")
+
+
+@unittest.skipIf(np is None, "requires numpy")
+class TestCodes(unittest.TestCase):
+    def test_numeric(self):
+        class Side(Namespace):
+            buy = 1
+            sell = -1
+            hold = 0
+
+        codes = Side.encode([0, 1, -1, 1])
+        np.testing.assert_array_equal(codes, [2, 0, 1, 0])
+        self.assertEqual(codes.dtype, np.uint8)
+        np.testing.assert_array_equal(Side.decode(codes), [0, 1, -1, 1])
+        np.testing.assert_array_equal(
+            Side.decode_names(codes), ["hold", "buy", "sell", "buy"]
+        )
+        # Shape is preserved
+        self.assertEqual(Side.encode(np.zeros((2, 3), dtype=int)).shape, (2, 3))
+
+    def test_strings(self):
+        class Currency(Namespace):
+            usd = "USD"
+            eur = "EUR"
+
+        class More(Currency):
+            gbp = "GBP"
+
+        codes = More.encode(np.array(["USD", "GBP", "EUR"]))
+        np.testing.assert_array_equal(codes, [1, 0, 2])
+        np.testing.assert_array_equal(More.decode(codes), ["USD", "GBP", "EUR"])
+
+    def test_mixed_values(self):
+        class Mixed(Namespace):
+            a = 1
+            b = "b"
+            c = (1, 2)
+            d = [3]
+
+        values = [(1, 2), "b", 1, [3]]
+        array = np.empty(4, dtype=object)
+        array[:] = values
+        codes = Mixed.encode(array)
+        np.testing.assert_array_equal(codes, [2, 1, 0, 3])
+        self.assertEqual(Mixed.decode(codes).tolist(), values)
+
+    def test_mixed_type_lists(self):
+        class Ambiguous(Namespace):
+            a = "1"
+            b = 1
+
+        np.testing.assert_array_equal(Ambiguous.encode(["1", 1, 1]), [0, 1, 1])
+
+        class Sizes(Namespace):
+            x = "x"
+            y = "yy"
+            z = 3
+
+        np.testing.assert_array_equal(Sizes.encode(["x", 3, "yy"]), [0, 2, 1])
+        np.testing.assert_array_equal(
+            Sizes.encode([["x", 3], [3, "yy"]]), [[0, 2], [2, 1]]
+        )
+        with self.assertRaises(ValueError) as e:
+            Sizes.encode(["x", "3"])
+        self.assertEqual(e.exception.args[1], ["3"])
+
+    def test_mixed_numbers_keep_their_types(self):
+        class Numbers(Namespace):
+            a = 1
+            b = 2.5
+            c = 3
+
+        class Answers(Namespace):
+            yes = True
+            two = 2
+
+        for cls in (Numbers, Answers):
+            decoded = cls.decode(cls.encode(list(cls))).tolist()
+            self.assertEqual([type(v) for v in decoded], [type(v) for v in cls])
+            self.assertEqual(decoded, list(cls))
+        self.assertIs(Answers.decode([0])[0], True)
+
+    def test_scalars_rejected(self):
+        class Side(Namespace):
+            buy = 1
+            sell = -1
+
+        for value in (1, "buy", np.int64(1)):
+            with self.assertRaises(TypeError, msg=value):
+                Side.encode(value)
+        np.testing.assert_array_equal(Side.encode([1]), [0])
+
+    def test_empty(self):
+        class Side(Namespace):
+            buy = 1
+            sell = -1
+
+        self.assertEqual(Side.encode([]).tolist(), [])
+        self.assertEqual(Side.decode([]).tolist(), [])
+        self.assertEqual(Side.decode_names([]).tolist(), [])
+
+    def test_duplicates_encode_to_first_member(self):
+        class Dup(Namespace):
+            a = 5
+            b = 5
+
+        np.testing.assert_array_equal(Dup.encode([5, 5]), [0, 0])
+
+    def test_unknown_values(self):
+        class Side(Namespace):
+            buy = 1
+            sell = 2
+
+        with self.assertRaises(ValueError) as e:
+            Side.encode([1, 7, 3, 7])
+        self.assertEqual(e.exception.args[1], [3, 7])
+
+        with self.assertRaises(ValueError) as e:
+            Side.encode(["x"])
+        self.assertEqual(e.exception.args[1], ["x"])
+
+    def test_invalid_codes(self):
+        class Side(Namespace):
+            buy = 1
+            sell = 2
+
+        with self.assertRaises(ValueError) as e:
+            Side.decode([0, 2, -1, 2])
+        self.assertEqual(e.exception.args[1], [-1, 2])
+        with self.assertRaises(TypeError):
+            Side.decode([0.5])
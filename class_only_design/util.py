@@ -1,6 +1,8 @@
+import sys
 import weakref
 
 from class_only_design import constants
+from class_only_design import flags
 
 
 def _is_dunder(name):
@@ -34,6 +36,43 @@ def _is_internal(name):
     return _is_dunder(name) or _is_sunder(name) or _is_reserved(name)
 
 
+def _internal_names(names):
+    """Return the set of `names` that are internal to the class_only_design library. This is
+    equivalent to filtering with _is_internal, but faster for large collections of names.
+    """
+    # Every __dunder__ and _sunder_ name ends with an underscore, and few other names do
+    internal = {
+        name
+        for name in names
+        if name[-1:] == "_" and (_is_dunder(name) or _is_sunder(name))
+    }
+    return internal.union(constants.RESERVED_NAMES.intersection(names))
+
+
+def approximate_size(value, limit=100_000):
+    """Return an approximate size in bytes of `value` and the objects it contains, following
+    the contents of lists, tuples, sets, dicts and objects' __dict__. Shared objects are counted
+    once. At most `limit` objects are visited.
+    """
+    seen = set()
+    pending = [value]
+    size = 0
+    while pending and len(seen) < limit:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+        elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+            pending.append(vars(obj))
+    return size
+
+
 class KeyGetter:
     def __init__(self, cls):
         """
@@ -51,8 +90,80 @@ class KeyGetter:
         return sorted(vars(self._cls_))
 
 
+class NameTable:
+    """The `nameof` attribute of namespace classes: an object whose attributes are the names of
+    the class's members, including inherited ones, set to themselves, so reading one is an
+    ordinary attribute lookup. Other attributes of the class, such as those of non-namespace
+    bases, are checked against the class as KeyGetter does.
+
+    Calling it with an iterable of names returns them as a list, after checking that they are
+    all attributes of the class.
+    """
+
+    # Members are stored in the instance __dict__. _cls_ is internal, so can't be a member
+    __slots__ = ("__dict__", "_cls_")
+
+    def __init__(self, cls, names):
+        # Hold a weakref to cls to avoid a circular reference
+        self._cls_ = weakref.ref(cls)
+        self.__dict__.update(zip(names, names))
+
+    def __getattr__(self, attr):
+        cls = self._cls_()
+        if cls is None or _is_internal(attr):
+            raise AttributeError(attr)
+        # Call getattr, so that an exception is raised as normal if the attr doesn't exist
+        getattr(cls, attr)
+        return attr
+
+    def __call__(self, names):
+        members = self.__dict__
+        names = list(names)
+        try:
+            return [members[name] for name in names]
+        except (KeyError, TypeError):
+            pass
+        missing = [n for n in names if not isinstance(n, str) or not hasattr(self, n)]
+        if missing:
+            raise AttributeError(f"Not attributes of the class: {missing}", missing)
+        return names
+
+    def __dir__(self):
+        return list(self.__dict__)
+
+
 class NamespaceLoader(dict):
+    """The class body namespace of namespace classes. Members whose value is `autoname` take
+    their name as their value, and members whose value is `autoflag` take the next power of two
+    above every flag member so far, including those in `inherited`, an iterable of inherited
+    member values. Only flags, i.e., powers of two, count: other ints, such as limits or masks
+    combining flags, don't reserve bits.
+    """
+
+    def __init__(self, inherited=()):
+        super().__init__()
+        self._inherited = inherited
+        # The value of the next autoflag member. Members are only looked at from the first
+        # autoflag member on, so that classes without flags don't pay for it
+        self._flag = None
+
+    def _see(self, v):
+        if flags.is_flag(v):
+            self._flag = max(self._flag, v << 1)
+
     def __setitem__(self, k, v):
         if v is constants.autoname:
-            return super().__setitem__(k, k)
+            v = k
+        elif v is constants.autoflag:
+            if self._flag is None:
+                self._flag = 1
+                for inherited in self._inherited:
+                    self._see(inherited)
+                for name, value in self.items():
+                    if isinstance(name, str) and not _is_internal(name):
+                        self._see(value)
+                self._inherited = None
+            v = self._flag
+        if self._flag is not None and isinstance(k, str) and not _is_internal(k):
+            self._see(v)
         return super().__setitem__(k, v)
@@ -0,0 +1,162 @@
+"""Vectorized conversion between namespace member values and integer codes.
+
+A member's code is its position in the namespace's iteration order. NumPy is required, but is
+only imported when one of these functions is first called.
+"""
+
+import weakref
+
+# Per namespace class conversion tables, built on first use
+_tables = weakref.WeakKeyDictionary()
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Namespace codes require numpy to be installed") from None
+    return numpy
+
+
+def _native(items):
+    """Return True if `items` all have the same type, which is bool, int, float or str, so that a
+    native dtype holds them without changing any of them. Mixed numbers would be upcast.
+    """
+    types = set(map(type, items))
+    return len(types) == 1 and types <= {bool, int, float, str}
+
+
+def _array(np, items):
+    """Return `items` as a 1d array, using a native dtype if they all have the same simple type,
+    and an object array otherwise.
+    """
+    if _native(items):
+        return np.asarray(items)
+    array = np.empty(len(items), dtype=object)
+    for i, item in enumerate(items):
+        array[i] = item
+    return array
+
+
+class _Table:
+    def __init__(self, np, members):
+        names = list(members.keys())
+        values = list(members.values())
+        self.size = len(values)
+        self.dtype = np.min_scalar_type(max(self.size - 1, 0))
+        self.values = _array(np, values)
+        self.names = np.asarray(names, dtype=object)
+
+        # The first code for each distinct value
+        self.index = {}
+        self.unhashable = []
+        for code, value in enumerate(values):
+            try:
+                self.index.setdefault(value, code)
+            except TypeError:
+                self.unhashable.append((code, value))
+
+        # For native dtypes, a sorted copy of the distinct values lets us encode with a search
+        self.sorted_values = self.sorted_codes = None
+        if self.values.dtype.kind != "O":
+            distinct = _array(np, list(self.index))
+            order = np.argsort(distinct, kind="stable")
+            self.sorted_values = distinct[order]
+            self.sorted_codes = np.fromiter(
+                self.index.values(), dtype=self.dtype, count=len(self.index)
+            )[order]
+
+    def code(self, value):
+        """Return the code for `value`, or -1 if it isn't a member value."""
+        try:
+            return self.index.get(value, -1)
+        except TypeError:
+            pass
+        for code, v in self.unhashable:
+            if v == value:
+                return code
+        return -1
+
+
+def _table(cls):
+    try:
+        return _tables[cls]
+    except KeyError:
+        table = _tables[cls] = _Table(_numpy(), cls._members_)
+        return table
+
+
+def _compatible(a, b):
+    numeric = "biuf"
+    return (a.kind in numeric and b.kind in numeric) or (a.kind == b.kind == "U")
+
+
+def encode(cls, values):
+    """Return an array of the codes of `values`, which must all be member values of `cls`. The
+    result has the same shape as `values`, and the smallest unsigned integer dtype that can hold
+    every code.
+
+    If any value is not a member, ValueError is raised listing every distinct unknown value.
+    """
+    np = _numpy()
+    table = _table(cls)
+    if not isinstance(values, np.ndarray):
+        # Converting a sequence of mixed types directly would turn them all into strings
+        objects = np.asarray(values, dtype=object)
+        values = np.asarray(values) if _native(objects.ravel().tolist()) else objects
+    if values.ndim == 0:
+        raise TypeError(
+            f"encode takes an array or sequence of values, not a single value: {values!r}"
+        )
+
+    if table.sorted_values is not None and _compatible(
+        values.dtype, table.sorted_values.dtype
+    ):
+        positions = np.searchsorted(table.sorted_values, values)
+        positions[positions == len(table.sorted_values)] = 0
+        found = table.sorted_values[positions] == values
+        if not found.all():
+            _unknown(cls, np.unique(values[~found]))
+        return table.sorted_codes[positions]
+
+    flat = values.ravel().tolist()
+    codes = np.fromiter(map(table.code, flat), dtype=np.int64, count=len(flat))
+    if (codes < 0).any():
+        _unknown(cls, values.ravel()[codes < 0])
+    return codes.astype(table.dtype).reshape(values.shape)
+
+
+def _unknown(cls, values):
+    unknown = []
+    for value in values.ravel().tolist():
+        if value not in unknown:
+            unknown.append(value)
+    raise ValueError(f"Values are not members of {cls.__name__}", unknown)
+
+
+def _check_codes(np, cls, table, codes):
+    codes = np.asarray(codes)
+    if codes.size == 0:
+        # An empty sequence becomes a float array
+        codes = codes.astype(np.intp)
+    if codes.dtype.kind not in "iu":
+        raise TypeError(f"Codes must be integers, not {codes.dtype}")
+    bad = (codes < 0) | (codes >= table.size)
+    if bad.any():
+        unknown = np.unique(codes[bad]).tolist()
+        raise ValueError(f"Codes are not valid for {cls.__name__}", unknown)
+    return codes
+
+
+def decode(cls, codes):
+    """Return an array of the member values for `codes`."""
+    np = _numpy()
+    table = _table(cls)
+    return table.values[_check_codes(np, cls, table, codes)]
+
+
+def decode_names(cls, codes):
+    """Return an array of the member names for `codes`."""
+    np = _numpy()
+    table = _table(cls)
+    return table.names[_check_codes(np, cls, table, codes)]
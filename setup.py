@@ -73,9 +73,10 @@ setup(
         "Programming Language :: Python :: 3.7",
     ],
     keywords="functional-programming singleton immutability",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     test_suite="class_only.tests",
     # install_requires='',
+    extras_require={"numpy": ["numpy"]},
     # $ setup.py publish support.
     cmdclass={"upload": UploadCommand},
 )